@@ -11,7 +11,10 @@ import time
 
 import pytest
 
+from src.core.api.enums import SentinelScope
+from src.core.api.finder.sentinels import clear_sentinels
 from src.core.api.os_helpers import OSHelper
+from src.core.api.screen.observer import stop_observers
 from src.core.util.arg_parser import get_core_args, set_core_arg
 from src.core.util.json_utils import update_run_index, create_run_log
 from src.core.util.run_report import create_footer
@@ -89,6 +92,7 @@ class BaseTarget:
         :param int exitstatus: the status which pytest will return to the system.
         """
         self.end_time = time.time()
+        clear_sentinels(SentinelScope.TARGET)
 
         update_run_index(self, True)
         footer = create_footer(self)
@@ -107,7 +111,8 @@ class BaseTarget:
         os.environ['CURRENT_TEST'] = str(item.__dict__.get('fspath'))
 
     def pytest_runtest_teardown(self, item):
-        pass
+        stop_observers()
+        clear_sentinels(SentinelScope.TEST)
 
     def pytest_runtestloop(self, session):
         pass
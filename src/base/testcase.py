@@ -7,13 +7,20 @@ import logging
 
 import pytest
 
-from src.core.api.finder.finder import highlight, wait, wait_vanish, find, find_all, exists
+from src.core.api.finder.finder import highlight, wait, wait_vanish, find, find_all, exists, find_any, find_all_of, \
+    right_of, below, near, inside, classify, find_color, count_pixels, get_pixel, wait_any, wait_all
+from src.core.api.finder.condition import Vanish
+from src.core.api.finder.match import Match
 from src.core.api.finder.pattern import Pattern
+from src.core.api.finder.sentinels import add_sentinel, remove_sentinel, clear_sentinels
 from src.core.api.keyboard.key import Key, KeyModifier
 from src.core.api.keyboard.keyboard import type, key_down, key_up
 from src.core.api.mouse.mouse import *
 from src.core.api.mouse.mouse_controller import Mouse
+from src.core.api.screen.baseline import compare_to_baseline
+from src.core.api.screen.observer import observe, stop_observers, ObserveEvent
 from src.core.api.screen.region import Region
+from src.core.api.screen.screen_state import register_state, remove_state, identify_state
 from src.core.api.screen.screen import *
 from src.core.api.enums import *
 from src.core.api.errors import *
@@ -0,0 +1,254 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.api.errors import FindError
+from src.core.api.finder import finder
+from src.core.api.finder.condition import Vanish
+from src.core.api.finder.image_search import image_check_conditions
+from src.core.api.finder.pattern import Pattern
+from src.core.api.keyboard import keyboard
+from src.core.api.location import Location
+from src.core.api.mouse import mouse
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen.display import DisplayCollection
+from src.core.api.screen.observer import Observer
+from src.core.api.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+ASYNC_MAX_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=ASYNC_MAX_WORKERS, thread_name_prefix='iris_async')
+_input_lock = threading.Lock()
+
+
+async def wait(ps, timeout: float = None, region: Rectangle = None):
+    """Wait for a Pattern or text to appear.
+
+    :param ps: Pattern or String.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param region: Rectangle object in order to minimize the area.
+    :return: Match object for a Pattern, Location object for a String, otherwise raise FindError.
+    """
+    conditions_met = await _wait_conditions([ps], False, timeout, region)
+    if conditions_met is None:
+        raise FindError('Unable to find %s' % _get_description(ps))
+    return conditions_met[0][1]
+
+
+async def exists(ps, timeout: float = None, region: Rectangle = None) -> bool:
+    """Check if a Pattern or text appears.
+
+    :param ps: Pattern or String.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param region: Rectangle object in order to minimize the area.
+    :return: True if found.
+    """
+    return await _wait_conditions([ps], False, timeout, region) is not None
+
+
+async def wait_vanish(ps, timeout: float = None, region: Rectangle = None) -> bool:
+    """Wait until a Pattern or text disappears.
+
+    :param ps: Pattern or String.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param region: Rectangle object in order to minimize the area.
+    :return: True if vanished, otherwise raise FindError.
+    """
+    if await _wait_conditions([Vanish(ps)], False, timeout, region) is None:
+        raise FindError('%s did not vanish' % _get_description(ps))
+    return True
+
+
+async def wait_any(conditions: list, timeout: float = None, region: Rectangle = None):
+    """Wait for the first of several conditions, see finder.wait_any.
+
+    :param conditions: List of Pattern, String or Vanish objects.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param region: Rectangle object in order to minimize the area.
+    :return: Pair of the met condition and its result, otherwise raise FindError.
+    """
+    conditions_met = await _wait_conditions(conditions, False, timeout, region)
+    if conditions_met is None:
+        raise FindError('None of %s was met' % ', '.join(_get_description(condition) for condition in conditions))
+    return conditions_met[0]
+
+
+async def wait_all(conditions: list, timeout: float = None, region: Rectangle = None):
+    """Wait until several conditions are all met on the same screenshot, see finder.wait_all.
+
+    :param conditions: List of Pattern, String or Vanish objects.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param region: Rectangle object in order to minimize the area.
+    :return: List of (condition, result) pairs in the given order, otherwise raise FindError.
+    """
+    conditions_met = await _wait_conditions(conditions, True, timeout, region)
+    if conditions_met is None:
+        raise FindError('Not all of %s were met' % ', '.join(_get_description(condition) for condition in conditions))
+    return conditions_met
+
+
+async def find(ps, region: Rectangle = None):
+    """Look for a single match of a Pattern or text, see finder.find."""
+    return await _run(finder.find, ps, region)
+
+
+async def find_all(ps, region: Rectangle = None, max_results: int = None):
+    """Look for all the matches of a Pattern or text, see finder.find_all."""
+    return await _run(finder.find_all, ps, region, max_results)
+
+
+async def move(lps, duration: int = None, region: Rectangle = None, align=None):
+    """Mouse move, see mouse.move."""
+    await _wait_for_target(lps, region)
+    await _run_input(mouse.move, lps, duration, region, align)
+
+
+async def hover(lps=None, region: Rectangle = None, align=None):
+    """Mouse hover, see mouse.hover."""
+    await _wait_for_target(lps, region)
+    await _run_input(mouse.hover, lps, region, align)
+
+
+async def click(lps=None, duration: int = None, region: Rectangle = None, align=None):
+    """Mouse left click, see mouse.click."""
+    await _wait_for_target(lps, region)
+    await _run_input(mouse.click, lps, duration, region, align)
+
+
+async def right_click(lps=None, duration: int = None, region: Rectangle = None, align=None):
+    """Mouse right click, see mouse.right_click."""
+    await _wait_for_target(lps, region)
+    await _run_input(mouse.right_click, lps, duration, region, align)
+
+
+async def double_click(lps=None, duration: int = None, region: Rectangle = None, align=None):
+    """Mouse double click, see mouse.double_click."""
+    await _wait_for_target(lps, region)
+    await _run_input(mouse.double_click, lps, duration, region, align)
+
+
+async def drag_drop(drag_from, drop_to, region: Rectangle = None, duration: float = None, align=None):
+    """Mouse drag and drop, see mouse.drag_drop."""
+    await _wait_for_target(drag_from, region)
+    await _wait_for_target(drop_to, region)
+    await _run_input(mouse.drag_drop, drag_from, drop_to, region, duration, align)
+
+
+async def type(text=None, modifier=None, interval: int = None):
+    """Keyboard type, see keyboard.type."""
+    await _run_input(keyboard.type, text, modifier, interval)
+
+
+async def key_down(key):
+    """Keyboard key down, see keyboard.key_down."""
+    await _run_input(keyboard.key_down, key)
+
+
+async def key_up(key):
+    """Keyboard key up, see keyboard.key_up."""
+    await _run_input(keyboard.key_up, key)
+
+
+async def observe(region: Rectangle = None, appear: list = None, vanish: list = None, change: bool = False,
+                  timeout: float = None):
+    """Stream the events of a background Observer of a region.
+
+    Usage: async for event in observe(region, appear=[dialog]): ...
+    The observer is stopped when the loop ends or is left.
+
+    :param region: Rectangle object, by default the primary display.
+    :param appear: List of Pattern objects reported when they become visible.
+    :param vanish: List of Pattern objects reported when they stop being visible.
+    :param change: True to report changes of the region.
+    :param timeout: Number of seconds after which the stream ends, None to run until the loop is left.
+    :return: Asynchronous iterator of ObserveEvent objects.
+    """
+    if region is None:
+        region = DisplayCollection[0].bounds
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def enqueue(event):
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    observer = Observer(region, [(pattern, enqueue) for pattern in appear or []],
+                        [(pattern, enqueue) for pattern in vanish or []], enqueue if change else None, timeout)
+    observer.start()
+    end_time = None if timeout is None else loop.time() + timeout
+    try:
+        while end_time is None or loop.time() < end_time:
+            try:
+                yield await asyncio.wait_for(queue.get(), None if end_time is None else end_time - loop.time())
+            except asyncio.TimeoutError:
+                break
+    finally:
+        await loop.run_in_executor(_executor, observer.stop)
+
+
+async def _wait_conditions(conditions: list, match_all: bool, timeout: float = None, region: Rectangle = None):
+    """Polls image_check_conditions from the event loop, at most Settings.wait_scan_rate times per second.
+
+    :return: List of (condition, result) pairs, with a Location for each String, or None.
+    """
+    for condition in conditions:
+        target = condition.target if isinstance(condition, Vanish) else condition
+        if not isinstance(target, (Pattern, str)):
+            raise ValueError('Invalid input')
+
+    if timeout is None:
+        timeout = Settings.auto_wait_timeout
+
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    end_time = start_time + timeout
+    last_fingerprint = None
+    while start_time < end_time:
+        logger.debug('Async wait: %s - %s seconds remaining' % (conditions, end_time - start_time))
+        conditions_met, last_fingerprint = await _run(image_check_conditions, conditions, match_all, region,
+                                                      last_fingerprint)
+        if conditions_met is not None:
+            return [(condition, Location(result.x, result.y) if isinstance(condition, str) else result)
+                    for condition, result in conditions_met]
+        if Settings.wait_scan_rate and Settings.wait_scan_rate > 0:
+            await asyncio.sleep(max(0.0, min(start_time + 1 / Settings.wait_scan_rate, end_time) - loop.time()))
+        else:
+            await asyncio.sleep(0)
+        start_time = loop.time()
+    return None
+
+
+def _get_description(condition) -> str:
+    if isinstance(condition, Vanish):
+        return '%s vanishing' % _get_description(condition.target)
+    return condition.get_filename() if isinstance(condition, Pattern) else condition
+
+
+async def _wait_for_target(lps, region: Rectangle = None):
+    """Waits for the Pattern or text an input action targets, so the wait does not block the event loop."""
+    if isinstance(lps, (Pattern, str)):
+        await wait(lps, region=region)
+
+
+async def _run(function, *args):
+    """Runs a blocking function in the thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(function, *args))
+
+
+async def _run_input(function, *args):
+    """Runs a mouse or keyboard function in the thread pool, one at a time since they share the input devices."""
+    return await _run(functools.partial(_call_with_lock, function), *args)
+
+
+def _call_with_lock(function, *args):
+    with _input_lock:
+        return function(*args)
@@ -197,3 +197,22 @@ class OSPlatform(str, Enum):
     MAC = 'osx'
 
     ALL = [WINDOWS, LINUX, MAC]
+
+
+class Relation(Enum):
+    RIGHT_OF = 'right_of'
+    BELOW = 'below'
+    NEAR = 'near'
+    INSIDE = 'inside'
+
+
+class SentinelScope(Enum):
+    SESSION = 'session'
+    TARGET = 'target'
+    TEST = 'test'
+
+
+class ObserveEventType(Enum):
+    APPEAR = 'appear'
+    VANISH = 'vanish'
+    CHANGE = 'change'
@@ -36,3 +36,10 @@ class ScreenshotError(Exception):
     def __init__(self, message):
         """Create an exception instance."""
         Exception.__init__(self, message)
+
+
+class SentinelError(Exception):
+    """Exception raised when a sentinel pattern appears on screen during a wait."""
+    def __init__(self, message):
+        """Create an exception instance."""
+        Exception.__init__(self, message)
@@ -0,0 +1,71 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import logging
+
+import cv2
+import numpy as np
+
+from src.core.api.finder.image_search import capture_region
+from src.core.api.location import Location
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen.display import DisplayCollection
+
+logger = logging.getLogger(__name__)
+
+
+def color_find(color: tuple, region: Rectangle = None, tolerance: int = 0, min_pixels: int = 1) -> list:
+    """Search the areas of a region or screen that have a given color.
+
+    :param color: (red, green, blue) tuple.
+    :param region: Rectangle object, by default the primary display.
+    :param tolerance: Maximum difference allowed on each color channel.
+    :param min_pixels: Minimum number of pixels of an area.
+    :return: List of Rectangle objects bounding each connected area of the color, largest first.
+    """
+    if region is None:
+        region = DisplayCollection[0].bounds
+
+    mask = _get_color_mask(capture_region(region).get_color_array(), color, tolerance)
+    count, labels, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    areas = sorted([stat for stat in stats[1:] if stat[4] >= min_pixels], key=lambda stat: stat[4], reverse=True)
+    logger.debug('Color find: %s area(s) of color %s' % (len(areas), color))
+    return [Rectangle(int(x) + region.x, int(y) + region.y, int(width), int(height))
+            for x, y, width, height, area in areas]
+
+
+def color_count(predicate, region: Rectangle = None, tolerance: int = 0) -> int:
+    """Count the pixels of a region or screen that satisfy a predicate.
+
+    :param predicate: (red, green, blue) tuple, or function taking the color array of the screenshot (height x width x
+    RGB) and returning a boolean array of the same height and width.
+    :param region: Rectangle object, by default the primary display.
+    :param tolerance: Maximum difference allowed on each color channel, when predicate is a color.
+    :return: Number of pixels.
+    """
+    if region is None:
+        region = DisplayCollection[0].bounds
+
+    color_array = capture_region(region).get_color_array()
+    if callable(predicate):
+        return int(np.count_nonzero(predicate(color_array)))
+    return cv2.countNonZero(_get_color_mask(color_array, predicate, tolerance))
+
+
+def color_at(location: Location) -> tuple:
+    """Returns the color of the pixel at a screen location.
+
+    :param location: Location object.
+    :return: (red, green, blue) tuple.
+    """
+    color_array = capture_region(Rectangle(location.x, location.y, 1, 1)).get_color_array()
+    return tuple(int(channel) for channel in color_array[0, 0])
+
+
+def _get_color_mask(color_array, color: tuple, tolerance: int = 0):
+    """Returns a mask of the pixels within tolerance of a color on every channel, 255 where they match."""
+    lower = tuple(max(0, int(channel) - tolerance) for channel in color)
+    upper = tuple(min(255, int(channel) + tolerance) for channel in color)
+    return cv2.inRange(color_array, lower, upper)
@@ -0,0 +1,16 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+class Vanish:
+    """Condition of wait_any and wait_all that is met while a Pattern or text is not visible."""
+
+    def __init__(self, ps):
+        """
+        :param ps: Pattern or String that must not be visible.
+        """
+        self.target = ps
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.target)
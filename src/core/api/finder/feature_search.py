@@ -0,0 +1,131 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import logging
+import threading
+
+import cv2
+import numpy as np
+
+from src.core.api.enums import MatchTemplateType
+from src.core.api.finder.match import Match
+from src.core.api.finder.pattern import Pattern
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen.screenshot_image import ScreenshotImage
+
+logger = logging.getLogger(__name__)
+
+ORB_PATTERN_FEATURES = 500
+ORB_SCREEN_FEATURES = 20000
+ORB_SCALE_FACTOR = 1.2
+ORB_LEVELS = 6
+ORB_PATCH_SIZE = 15
+ORB_FAST_THRESHOLD = 10
+ORB_RATIO = 0.75
+ORB_MIN_MATCHES = 8
+ORB_RANSAC_THRESHOLD = 5.0
+ORB_MAX_SCALE = 4
+
+_pattern_features = {}
+_screen_features = {}
+_lock = threading.Lock()
+
+
+def feature_match_in_image(pattern: Pattern, stack_image: ScreenshotImage, region: Rectangle,
+                           match_type: MatchTemplateType = MatchTemplateType.SINGLE, max_results: int = None,
+                           correlation_cache: dict = None) -> list:
+    """Find a pattern in an already captured screenshot by matching ORB keypoints.
+
+    Pattern keypoints are matched to the screenshot keypoints with a ratio test, and a homography is fitted to the
+    matches with RANSAC, so the pattern is found at any scale and under small perspective changes in a single pass.
+    The screenshot area the homography points to is then warped back to the pattern size, and its normalized
+    correlation with the pattern is the match score, compared to the pattern similarity. Only the best occurrence is
+    returned, for both match types.
+
+    :param Pattern pattern: Image details.
+    :param ScreenshotImage stack_image: Screenshot of the region.
+    :param Region region: Region the screenshot was taken from, used to convert to screen coordinates.
+    :param MatchTemplateType match_type: Type of match_template (single or multiple).
+    :param max_results: Unused, kept for the backend signature.
+    :param correlation_cache: Unused, kept for the backend signature.
+    :return: List of Match objects, in screen coordinates.
+    """
+    pattern_array = pattern.get_gray_array()
+    pattern_keypoints, pattern_descriptors = _get_pattern_features(pattern)
+    if pattern_descriptors is None or len(pattern_keypoints) < ORB_MIN_MATCHES:
+        logger.debug('Feature search: %s has too few keypoints' % pattern.get_filename())
+        return []
+
+    stack_array = stack_image.get_gray_array()
+    screen_keypoints, screen_descriptors = _get_screen_features(stack_image, stack_array)
+    if screen_descriptors is None or len(screen_keypoints) < ORB_MIN_MATCHES:
+        return []
+
+    pairs = cv2.BFMatcher(cv2.NORM_HAMMING).knnMatch(pattern_descriptors, screen_descriptors, k=2)
+    good = [pair[0] for pair in pairs if len(pair) == 2 and pair[0].distance < ORB_RATIO * pair[1].distance]
+    if len(good) < ORB_MIN_MATCHES:
+        logger.debug('Feature search: %s keypoint match(es) for %s' % (len(good), pattern.get_filename()))
+        return []
+
+    source = np.float32([pattern_keypoints[match.queryIdx].pt for match in good]).reshape(-1, 1, 2)
+    destination = np.float32([screen_keypoints[match.trainIdx].pt for match in good]).reshape(-1, 1, 2)
+    homography, inliers = cv2.findHomography(source, destination, cv2.RANSAC, ORB_RANSAC_THRESHOLD)
+    if homography is None or int(inliers.sum()) < ORB_MIN_MATCHES:
+        return []
+
+    p_height, p_width = pattern_array.shape[:2]
+    corners = np.float32([[0, 0], [p_width, 0], [p_width, p_height], [0, p_height]]).reshape(-1, 1, 2)
+    corners = cv2.perspectiveTransform(corners, homography)
+    if not _is_plausible_area(corners, p_width, p_height):
+        return []
+
+    warped = cv2.warpPerspective(stack_array, homography, (p_width, p_height),
+                                 flags=cv2.WARP_INVERSE_MAP | cv2.INTER_LINEAR)
+    score = float(cv2.matchTemplate(warped, pattern_array, cv2.TM_CCOEFF_NORMED)[0, 0])
+    logger.debug('Feature search: %s inlier(s) for %s, score %s' % (int(inliers.sum()), pattern.get_filename(),
+                                                                     score))
+    if score < pattern.similarity:
+        return []
+
+    x, y, width, height = cv2.boundingRect(np.int32(np.round(corners)))
+    return [Match(x + region.x, y + region.y, width, height, score, stack_image.frame_id)]
+
+
+def _is_plausible_area(corners, p_width: int, p_height: int) -> bool:
+    """Rejects homographies that fold the pattern or scale it beyond ORB_MAX_SCALE."""
+    if not cv2.isContourConvex(np.int32(np.round(corners))):
+        return False
+    area_ratio = cv2.contourArea(corners) / float(p_width * p_height)
+    return 1.0 / ORB_MAX_SCALE ** 2 <= area_ratio <= ORB_MAX_SCALE ** 2
+
+
+def _create_detector(features: int):
+    return cv2.ORB_create(nfeatures=features, scaleFactor=ORB_SCALE_FACTOR, nlevels=ORB_LEVELS,
+                          edgeThreshold=ORB_PATCH_SIZE, patchSize=ORB_PATCH_SIZE, fastThreshold=ORB_FAST_THRESHOLD)
+
+
+def _get_pattern_features(pattern: Pattern):
+    """Returns the keypoints and descriptors of a pattern, computed once per image."""
+    key = pattern.get_file_path()
+    with _lock:
+        if key not in _pattern_features:
+            _pattern_features[key] = _create_detector(ORB_PATTERN_FEATURES).detectAndCompute(
+                pattern.get_gray_array(), None)
+        return _pattern_features[key]
+
+
+def _get_screen_features(stack_image: ScreenshotImage, stack_array):
+    """Returns the keypoints and descriptors of a screenshot. The last screenshot of each display is kept, so
+    searching several patterns in the same capture detects its keypoints once."""
+    key = (stack_image.frame_id, stack_array.shape, stack_array.ctypes.data)
+    with _lock:
+        cached = _screen_features.get(stack_image.screen_id)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    features = _create_detector(ORB_SCREEN_FEATURES).detectAndCompute(stack_array, None)
+    with _lock:
+        _screen_features[stack_image.screen_id] = key, features
+    return features
@@ -6,14 +6,20 @@
 import time
 
 from src.core.api.enums import Color
-from src.core.api.enums import MatchTemplateType
+from src.core.api.enums import MatchTemplateType, Relation
 from src.core.api.errors import FindError
-from src.core.api.finder.image_search import image_find, match_template, image_vanish
+from src.core.api.finder.color_search import color_find, color_count, color_at
+from src.core.api.finder.condition import Vanish
+from src.core.api.finder.image_search import image_find, match_template, image_vanish, image_find_any, \
+    image_find_all_of, image_find_related, image_classify, check_sentinels, image_wait_conditions
+from src.core.api.finder.match import Match
 from src.core.api.finder.pattern import Pattern
 from src.core.api.finder.text_search import text_find, text_find_all
 from src.core.api.highlight.screen_highlight import ScreenHighlight, HighlightRectangle
 from src.core.api.location import Location
 from src.core.api.rectangle import Rectangle
+from src.core.api.screen.display import DisplayCollection
+from src.core.api.screen.screenshot_image import ScreenshotImage
 from src.core.api.settings import Settings
 from src.core.util.arg_parser import get_core_args
 
@@ -24,7 +30,7 @@ def highlight(region=None, seconds=None, color=None, ps=None, location=None, tex
     :param seconds: How many seconds the region is highlighted. By default the region is highlighted for 2 seconds.
     :param color: Color used to highlight the region. Default color is red.
     :param ps: Pattern or str.
-    :param location: pattern Location.
+    :param location: List of pattern Locations or Matches.
     :param text_location: list of Rectangles with text occurrences.
     :return: None.
     """
@@ -48,8 +54,8 @@ def highlight(region=None, seconds=None, color=None, ps=None, location=None, tex
 
     if ps is not None:
         if isinstance(ps, Pattern):
-            width, height = ps.get_size()
             for loc in location:
+                width, height = loc.get_size() if isinstance(loc, Match) else ps.get_size()
                 hl.draw_rectangle(HighlightRectangle(loc.x, loc.y, width, height, color))
         elif isinstance(ps, str):
             for loc in text_location:
@@ -59,12 +65,12 @@ def highlight(region=None, seconds=None, color=None, ps=None, location=None, tex
     time.sleep(seconds)
 
 
-def find(ps: Pattern or str, region: Rectangle = None) -> Location or FindError:
+def find(ps: Pattern or str, region: Rectangle = None) -> Match or Location or FindError:
     """Look for a single match of a Pattern or image.
 
     :param ps: Pattern or String.
     :param region: Rectangle object in order to minimize the area.
-    :return: Location object.
+    :return: Match object for a Pattern, Location object for a String.
     """
     if isinstance(ps, Pattern):
         image_found = match_template(ps, region, MatchTemplateType.SINGLE)
@@ -84,15 +90,16 @@ def find(ps: Pattern or str, region: Rectangle = None) -> Location or FindError:
             raise FindError('Unable to find text %s' % ps)
 
 
-def find_all(ps: Pattern or str, region: Rectangle = None):
+def find_all(ps: Pattern or str, region: Rectangle = None, max_results: int = None):
     """Look for all matches of a Pattern or image.
 
     :param ps: Pattern or String.
     :param region: Rectangle object in order to minimize the area.
-    :return: Location object or FindError.
+    :param max_results: Maximum number of Pattern matches to return, best scores first.
+    :return: List of Match objects for a Pattern, list of Location objects for a String, or FindError.
     """
     if isinstance(ps, Pattern):
-        images_found = match_template(ps, region, MatchTemplateType.MULTIPLE)
+        images_found = match_template(ps, region, MatchTemplateType.MULTIPLE, max_results)
         if len(images_found) > 0:
             if get_core_args().highlight:
                 highlight(region=region, ps=ps, location=images_found)
@@ -112,13 +119,242 @@ def find_all(ps: Pattern or str, region: Rectangle = None):
             raise FindError('Unable to find text %s' % ps)
 
 
-def wait(ps, timeout=None, region=None) -> bool or FindError:
+def find_any(patterns: list, timeout: float = None, region: Rectangle = None):
+    """Look for the first of several Patterns that appears, testing all of them against the same screenshot.
+
+    :param patterns: List of Pattern objects, in order of preference.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param region: Rectangle object in order to minimize the area.
+    :return: Pair of the matching Pattern and its Match, otherwise raise FindError.
+    """
+    if timeout is None:
+        timeout = Settings.auto_wait_timeout
+
+    image_found = image_find_any(patterns, timeout, region)
+    if image_found is not None:
+        pattern, location = image_found
+        if get_core_args().highlight:
+            highlight(region=region, ps=pattern, location=[location])
+        return image_found
+    else:
+        raise FindError('Unable to find any of the images %s' % ', '.join(p.get_filename() for p in patterns))
+
+
+def find_all_of(patterns: list, timeout: float = None, region: Rectangle = None):
+    """Look for several Patterns that are all visible at the same time, testing all of them against the same
+    screenshot.
+
+    :param patterns: List of Pattern objects.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param region: Rectangle object in order to minimize the area.
+    :return: List of (Pattern, Match) pairs in the given order, otherwise raise FindError.
+    """
+    if timeout is None:
+        timeout = Settings.auto_wait_timeout
+
+    images_found = image_find_all_of(patterns, timeout, region)
+    if images_found is not None:
+        if get_core_args().highlight:
+            for pattern, location in images_found:
+                highlight(region=region, ps=pattern, location=[location])
+        return images_found
+    else:
+        raise FindError('Unable to find all of the images %s' % ', '.join(p.get_filename() for p in patterns))
+
+
+def wait_any(conditions: list, timeout: float = None, region: Rectangle = None):
+    """Wait for the first of several conditions, testing all of them against the same screenshot on each tick.
+
+    :param conditions: List of Pattern, String or Vanish objects.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param region: Rectangle object in order to minimize the area.
+    :return: Pair of the met condition and its result (Match for a Pattern, Location for a String, True for a Vanish),
+    otherwise raise FindError.
+    """
+    conditions_met = _wait_conditions(conditions, False, timeout, region)
+    if conditions_met is None:
+        raise FindError('None of %s was met' % ', '.join(_get_condition_description(c) for c in conditions))
+    return conditions_met[0]
+
+
+def wait_all(conditions: list, timeout: float = None, region: Rectangle = None):
+    """Wait until several conditions are all met on the same screenshot.
+
+    :param conditions: List of Pattern, String or Vanish objects.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param region: Rectangle object in order to minimize the area.
+    :return: List of (condition, result) pairs in the given order (Match for a Pattern, Location for a String, True
+    for a Vanish), otherwise raise FindError.
+    """
+    conditions_met = _wait_conditions(conditions, True, timeout, region)
+    if conditions_met is None:
+        raise FindError('Not all of %s were met' % ', '.join(_get_condition_description(c) for c in conditions))
+    return conditions_met
+
+
+def _wait_conditions(conditions: list, match_all: bool, timeout: float = None, region: Rectangle = None):
+    for condition in conditions:
+        target = condition.target if isinstance(condition, Vanish) else condition
+        if not isinstance(target, (Pattern, str)):
+            raise ValueError('Invalid input')
+
+    if timeout is None:
+        timeout = Settings.auto_wait_timeout
+
+    conditions_met = image_wait_conditions(conditions, match_all, timeout, region)
+    if conditions_met is None:
+        return None
+
+    results = []
+    for condition, result in conditions_met:
+        if isinstance(condition, Pattern):
+            if get_core_args().highlight:
+                highlight(region=region, ps=condition, location=[result])
+        elif isinstance(condition, str):
+            if get_core_args().highlight:
+                highlight(region=region, ps=condition, text_location=[result])
+            result = Location(result.x, result.y)
+        results.append((condition, result))
+    return results
+
+
+def _get_condition_description(condition) -> str:
+    if isinstance(condition, Vanish):
+        return '%s vanishing' % _get_description(condition.target)
+    return _get_description(condition)
+
+
+def classify(cells: list, patterns: list) -> list:
+    """Find which of several Patterns each cell of a grid shows, testing all of them against the same screenshot.
+
+    :param cells: List of Regions, or list of lists of Regions as returned by Region.get_matrix.
+    :param patterns: List of Pattern objects.
+    :return: Table with the shape of cells, holding the (Pattern, Match) pair of the best Pattern found in each cell,
+    or None for the cells where none of them is found.
+    """
+    table = image_classify(cells, patterns)
+    if get_core_args().highlight:
+        rows = table if len(table) > 0 and isinstance(table[0], list) else [table]
+        for row in rows:
+            for result in row:
+                if result is not None:
+                    highlight(ps=result[0], location=[result[1]])
+    return table
+
+
+def find_color(color: tuple, region: Rectangle = None, tolerance: int = 0, min_pixels: int = 1) -> list or FindError:
+    """Look for the areas that have a given color.
+
+    :param color: (red, green, blue) tuple.
+    :param region: Rectangle object in order to minimize the area.
+    :param tolerance: Maximum difference allowed on each color channel.
+    :param min_pixels: Minimum number of pixels of an area.
+    :return: List of Rectangle objects bounding each area, largest first, otherwise raise FindError.
+    """
+    areas = color_find(color, region, tolerance, min_pixels)
+    if len(areas) > 0:
+        return areas
+    else:
+        raise FindError('Unable to find color %s' % (color,))
+
+
+def count_pixels(predicate, region: Rectangle = None, tolerance: int = 0) -> int:
+    """Count the pixels that have a given color or satisfy a predicate.
+
+    :param predicate: (red, green, blue) tuple, or function taking an RGB array and returning a boolean array.
+    :param region: Rectangle object in order to minimize the area.
+    :param tolerance: Maximum difference allowed on each color channel, when predicate is a color.
+    :return: Number of pixels.
+    """
+    return color_count(predicate, region, tolerance)
+
+
+def get_pixel(location: Location) -> tuple:
+    """Get the color of the pixel at a screen location.
+
+    :param location: Location object.
+    :return: (red, green, blue) tuple.
+    """
+    return color_at(location)
+
+
+def right_of(anchor: Pattern or str, target: Pattern or str, region: Rectangle = None, distance: int = None):
+    """Look for a Pattern or text to the right of another one, both searched in the same screenshot.
+
+    :param anchor: Pattern or String.
+    :param target: Pattern or String, vertically overlapping the anchor.
+    :param region: Rectangle object in order to minimize the area.
+    :param distance: Maximum gap in pixels between the anchor and the target, by default up to the region edge.
+    :return: Match object for a Pattern target, Location object for a String target, otherwise raise FindError.
+    """
+    return _find_related(anchor, target, Relation.RIGHT_OF, region, distance)
+
+
+def below(anchor: Pattern or str, target: Pattern or str, region: Rectangle = None, distance: int = None):
+    """Look for a Pattern or text below another one, both searched in the same screenshot.
+
+    :param anchor: Pattern or String.
+    :param target: Pattern or String, horizontally overlapping the anchor.
+    :param region: Rectangle object in order to minimize the area.
+    :param distance: Maximum gap in pixels between the anchor and the target, by default up to the region edge.
+    :return: Match object for a Pattern target, Location object for a String target, otherwise raise FindError.
+    """
+    return _find_related(anchor, target, Relation.BELOW, region, distance)
+
+
+def near(anchor: Pattern or str, target: Pattern or str, region: Rectangle = None, distance: int = None):
+    """Look for a Pattern or text around another one, both searched in the same screenshot.
+
+    :param anchor: Pattern or String.
+    :param target: Pattern or String.
+    :param region: Rectangle object in order to minimize the area.
+    :param distance: Number of pixels the anchor area is grown by on each side, 50 by default.
+    :return: Match object for a Pattern target, Location object for a String target, otherwise raise FindError.
+    """
+    return _find_related(anchor, target, Relation.NEAR, region, distance)
+
+
+def inside(anchor: Pattern or str, target: Pattern or str, region: Rectangle = None):
+    """Look for a Pattern or text within the area of another one, both searched in the same screenshot.
+
+    :param anchor: Pattern or String.
+    :param target: Pattern or String.
+    :param region: Rectangle object in order to minimize the area.
+    :return: Match object for a Pattern target, Location object for a String target, otherwise raise FindError.
+    """
+    return _find_related(anchor, target, Relation.INSIDE, region)
+
+
+def _find_related(anchor, target, relation: Relation, region: Rectangle = None, distance: int = None):
+    related_found = image_find_related(anchor, target, relation, region, distance)
+    if related_found is None:
+        raise FindError('Unable to find %s %s %s' % (_get_description(target), relation.value.replace('_', ' '),
+                                                     _get_description(anchor)))
+
+    anchor_found, target_found = related_found
+    if get_core_args().highlight:
+        if isinstance(target, Pattern):
+            highlight(region=region, ps=target, location=[target_found])
+        else:
+            highlight(region=region, ps=target, text_location=[target_found])
+
+    if isinstance(target, Pattern):
+        return target_found
+    return Location(target_found.x, target_found.y)
+
+
+def _get_description(ps: Pattern or str) -> str:
+    return ps.get_filename() if isinstance(ps, Pattern) else ps
+
+
+def wait(ps, timeout=None, region=None) -> Match or Location or FindError:
     """Verify that a Pattern or str appears.
 
     :param ps: String or Pattern.
     :param timeout: Number as maximum waiting time in seconds.
     :param region: Rectangle object in order to minimize the area.
-    :return: True if found, otherwise raise FindError.
+    :return: Match object for a Pattern, Location object for a String, otherwise raise FindError. Raise SentinelError
+    when a sentinel pattern appears.
     """
     if isinstance(ps, Pattern):
         if timeout is None:
@@ -128,11 +364,14 @@ def wait(ps, timeout=None, region=None) -> bool or FindError:
         if image_found is not None:
             if get_core_args().highlight:
                 highlight(region=region, ps=ps, location=[image_found])
-            return True
+            return image_found
         else:
             raise FindError('Unable to find image %s' % ps.get_filename())
     elif isinstance(ps, str):
-        text_found = text_find(ps, region)
+        search_region = DisplayCollection[0].bounds if region is None else region
+        stack_image = ScreenshotImage(region=search_region)
+        check_sentinels([(search_region, stack_image)])
+        text_found = text_find(ps, search_region, stack_image)
         if len(text_found) > 0:
             if get_core_args().highlight:
                 highlight(region=region, ps=ps, text_location=text_found)
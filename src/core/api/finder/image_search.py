@@ -3,9 +3,13 @@
 # You can obtain one at http://mozilla.org/MPL/2.0/.
 
 
+import copy
 import datetime
 import logging
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2
 import numpy as np
@@ -16,9 +20,15 @@ try:
 except ImportError:
     from PIL import Image
 
-from src.core.api.enums import MatchTemplateType
-from src.core.api.errors import ScreenshotError
+from src.core.api.enums import MatchTemplateType, Relation
+from src.core.api.errors import ScreenshotError, SentinelError
+from src.core.api.finder.condition import Vanish
+from src.core.api.finder.feature_search import feature_match_in_image
+from src.core.api.finder.location_priors import get_prior_locations, record_location
+from src.core.api.finder.match import Match
 from src.core.api.finder.pattern import Pattern
+from src.core.api.finder.sentinels import get_sentinels
+from src.core.api.finder.text_search import text_find
 from src.core.api.location import Location
 from src.core.api.rectangle import Rectangle
 from src.core.api.save_debug_image.save_image import save_debug_image
@@ -30,6 +40,51 @@ from src.core.api.settings import Settings
 logger = logging.getLogger(__name__)
 
 FIND_METHOD = cv2.TM_CCOEFF_NORMED
+SCORE_TIE_TOLERANCE = 1e-4
+
+PYRAMID_MAX_LEVELS = 3
+PYRAMID_MIN_PATTERN_SIZE = 12
+PYRAMID_CANDIDATES = 5
+PYRAMID_SIMILARITY_MARGIN = 0.2
+
+PRIOR_WINDOWS = 3
+
+TILE_ROWS = 256
+TILE_TOLERANCE = 2e-2
+
+EXACT_ANCHOR_COUNT = 8
+EXACT_MASK_ANCHORS = 2
+
+SUB_PATCH_SIZE = 24
+SUB_PATCH_MIN_PATTERN_SIZE = 64
+SUB_PATCH_CANDIDATES = 5
+SUB_PATCH_UNIQUENESS = 0.7
+SUB_PATCH_SIMILARITY_MARGIN = 0.2
+SUB_PATCH_SLACK = 2
+
+PREFILTER_CELL_SIZE = 16
+PREFILTER_MAX_COVERAGE = 0.5
+
+DIRTY_CELL_SIZE = 32
+DIRTY_MAX_COVERAGE = 0.5
+
+RESULT_CACHE_SIZE = 32
+
+NEAR_DISTANCE = 50
+
+_match_pool = None
+_match_pool_size = 0
+_match_pool_lock = threading.Lock()
+_display_pool = ThreadPoolExecutor(max_workers=max(1, len(DisplayCollection)), thread_name_prefix='iris_display')
+
+_last_match_locations = {}
+_discovered_scales = {}
+_exact_signatures = {}
+_sub_patches = {}
+_locality_stats = {'lookups': 0, 'hits': 0}
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+_backends = {}
 
 
 def _is_pattern_size_correct(pattern, region):
@@ -52,54 +107,818 @@ def _is_pattern_size_correct(pattern, region):
 
 
 def match_template(pattern: Pattern, region: Rectangle = None,
-                   match_type: MatchTemplateType = MatchTemplateType.SINGLE):
+                   match_type: MatchTemplateType = MatchTemplateType.SINGLE, max_results: int = None):
     """Find a pattern in a Region or full screen
 
     :param Pattern pattern: Image details
     :param Region region: Region object.
     :param MatchTemplateType match_type: Type of match_template (single or multiple)
-    :return: Location.
+    :param max_results: Maximum number of locations returned by a multiple match, best scores first.
+    :return: List of Match objects.
     """
-    if region is None:
-        region = DisplayCollection[0].bounds
-
-    locations_list = []
-    save_img_location_list = []
     if not isinstance(match_type, MatchTemplateType):
         logger.warning('%s should be an instance of `%s`' % (match_type, MatchTemplateType))
         return []
-    try:
-        stack_image = ScreenshotImage(region=region, screen_id=_region_in_display_list(region))
-        precision = pattern.similarity
+
+    frames = _get_screenshots(region, [pattern])
+    if frames is None:
+        return []
+
+    return _match_template_in_frames(pattern, frames, match_type, max_results)
+
+
+def _match_template_in_frames(pattern: Pattern, frames: list,
+                              match_type: MatchTemplateType = MatchTemplateType.SINGLE, max_results: int = None,
+                              correlation_cache: dict = None):
+    """Find a pattern in already captured screenshots of one or more displays.
+
+    Screenshots from several displays are searched in parallel and their results merged by score. Results are kept in
+    a small LRU cache, so the same search on the same pixels is only run once.
+
+    :param Pattern pattern: Image details
+    :param frames: List of (Rectangle, ScreenshotImage) pairs, as returned by _get_screenshots.
+    :param MatchTemplateType match_type: Type of match_template (single or multiple)
+    :param max_results: Maximum number of locations returned by a multiple match, best scores first.
+    :param correlation_cache: Dict kept by a polling loop between ticks to update correlation maps incrementally.
+    :return: List of Match objects.
+    """
+    search_start = time.time()
+    cache_key = None
+    if Settings.result_cache:
+        cache_key = _get_result_cache_key(pattern, frames, match_type, max_results)
+        cached_matches = _get_cached_result(cache_key, frames)
+        if cached_matches is not None:
+            logger.debug('Result cache hit for %s' % pattern.get_filename())
+            search_time = time.time() - search_start
+            for match in cached_matches:
+                match.search_time = search_time
+            return cached_matches
+
+    backend = _get_backend(pattern)
+    if len(frames) == 1:
+        frame_region, stack_image = frames[0]
+        matches = backend(pattern, stack_image, frame_region, match_type, max_results, correlation_cache)
+    else:
+        results = _display_pool.map(
+            lambda frame: backend(pattern, frame[1], frame[0], match_type, max_results, correlation_cache), frames)
+        matches = _remove_duplicate_matches(sorted([match for result in results for match in result],
+                                                   key=lambda match: match.score, reverse=True))
+        if match_type is MatchTemplateType.SINGLE:
+            matches = matches[:1]
+            if len(matches) == 1:
+                _last_match_locations[pattern.get_file_path()] = matches[0].get_location()
+        elif max_results is not None:
+            matches = matches[:max_results]
+
+    search_time = time.time() - search_start
+    for match in matches:
+        match.search_time = search_time
+    if cache_key is not None:
+        _cache_result(cache_key, matches, frames)
+    return matches
+
+
+def _remove_duplicate_matches(matches: list) -> list:
+    """Drops the matches overlapping a better one, found twice where the screenshots of several displays overlap.
+
+    :param matches: List of Match objects, best scores first.
+    :return: List of Match objects, best scores first.
+    """
+    kept = []
+    for match in matches:
+        if all(abs(match.x - other.x) >= min(match.width, other.width) or
+               abs(match.y - other.y) >= min(match.height, other.height) for other in kept):
+            kept.append(match)
+    return kept
+
+
+def _get_result_cache_key(pattern: Pattern, frames: list, match_type: MatchTemplateType, max_results: int):
+    """Returns the key of a search in the result cache: the captured pixels and area, and everything about the
+    pattern and the search options that can change the result."""
+    fingerprints = _get_frames_fingerprint(frames, [pattern])
+    areas = tuple((part.x, part.y, part.width, part.height, stack_image.screen_id) for part, stack_image in frames)
+    return (fingerprints, areas, pattern.get_file_path(), pattern.similarity, match_type, max_results,
+            _get_backend_name(pattern), tuple(_get_search_scales(pattern, frames[0][1])), _is_pyramid_search(pattern),
+            _is_sub_patch_search(pattern))
+
+
+def _get_cached_result(cache_key, frames: list):
+    """Returns copies of the cached matches for a search, or None if it is not cached.
+
+    The copies are stamped with the frame id of the screenshot at the same position in frames, since a hit means
+    those screenshots hold the same pixels as the ones the matches were found in.
+    """
+    with _result_cache_lock:
+        entries = _result_cache.get(cache_key)
+        if entries is None:
+            return None
+        _result_cache.move_to_end(cache_key)
+        matches = []
+        for index, match in entries:
+            match = copy.copy(match)
+            if index is not None:
+                match.frame_id = frames[index][1].frame_id
+            matches.append(match)
+        return matches
+
+
+def _cache_result(cache_key, matches: list, frames: list):
+    """Stores copies of the matches found by a search, with the position in frames of the screenshot each one was
+    found in, evicting the least recently used entry when the cache holds RESULT_CACHE_SIZE searches."""
+    frame_ids = [stack_image.frame_id for part, stack_image in frames]
+    with _result_cache_lock:
+        _result_cache[cache_key] = [(frame_ids.index(match.frame_id) if match.frame_id in frame_ids else None,
+                                     copy.copy(match)) for match in matches]
+        _result_cache.move_to_end(cache_key)
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
+def _match_template_in_image(pattern: Pattern, stack_image: ScreenshotImage, region: Rectangle,
+                             match_type: MatchTemplateType = MatchTemplateType.SINGLE, max_results: int = None,
+                             correlation_cache: dict = None):
+    """Find a pattern in an already captured screenshot.
+
+    :param Pattern pattern: Image details
+    :param ScreenshotImage stack_image: Screenshot of the region.
+    :param Region region: Region the screenshot was taken from, used to convert to screen coordinates.
+    :param MatchTemplateType match_type: Type of match_template (single or multiple)
+    :param max_results: Maximum number of locations returned by a multiple match, best scores first.
+    :param correlation_cache: Dict kept by a polling loop between ticks, or None to correlate the whole screenshot.
+    :return: List of Match objects, in screen coordinates.
+    """
+    matches = []
+    save_img_location_list = []
+
+    precision = pattern.similarity
+    logger.debug('Searching image with similarity %s' % precision)
+    if precision == 0.99:
+        stack_array = stack_image.get_color_array()
+    else:
+        stack_array = stack_image.get_gray_array()
+
+    for scale in _get_search_scales(pattern, stack_image):
         if precision == 0.99:
-            logger.debug('Searching image with similarity %s' % precision)
-            res = cv2.matchTemplate(stack_image.get_color_array(), pattern.get_color_array(),FIND_METHOD)
+            pattern_array = pattern.get_scaled_color_array(scale)
         else:
-            logger.debug('Searching image with similarity %s' % precision)
-            res = cv2.matchTemplate(stack_image.get_gray_array(), pattern.get_gray_array(), FIND_METHOD)
+            pattern_array = pattern.get_scaled_gray_array(scale)
 
+        p_height, p_width = pattern_array.shape[:2]
+        if stack_array.shape[0] < p_height or stack_array.shape[1] < p_width:
+            continue
 
         if match_type is MatchTemplateType.SINGLE:
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
-            logger.debug('Min location %s and max location %s' %(min_val,max_val))
+            fast_match = None
+            if Settings.locality_search:
+                fast_match = _locality_match_template(pattern, stack_array, pattern_array, region, precision)
+            if fast_match is None and Settings.location_priors:
+                fast_match = _prior_match_template(pattern, stack_array, pattern_array, region, precision)
+            if fast_match is None and precision == 0.99:
+                fast_match = _exact_match_template(pattern, stack_array, pattern_array, scale)
+            if fast_match is None and _is_sub_patch_search(pattern):
+                fast_match = _sub_patch_match_template(pattern, stack_array, pattern_array, scale, precision)
+            if fast_match is None and _is_pyramid_search(pattern):
+                fast_match = _pyramid_match_template(stack_array, pattern_array, precision)
+
+            if fast_match is not None:
+                max_val, max_loc = fast_match
+            else:
+                if correlation_cache is not None and Settings.incremental_search:
+                    cache_key = (stack_image.screen_id, region.x, region.y, scale, stack_array.ndim)
+                    res = _get_incremental_correlation_map(stack_array, pattern_array, correlation_cache, cache_key)
+                else:
+                    res = _get_correlation_map(stack_array, pattern_array)
+                max_val, max_loc = _get_best_location(res)
+                logger.debug('Max value %s at %s' % (max_val, max_loc))
             if max_val >= precision:
-                locations_list.append(Location(max_loc[0] + region.x, max_loc[1] + region.y))
+                location = Location(max_loc[0] + region.x, max_loc[1] + region.y)
+                matches.append(Match(location.x, location.y, p_width, p_height, float(max_val), stack_image.frame_id))
                 save_img_location_list.append(Location(max_loc[0], max_loc[1]))
+                _last_match_locations[pattern.get_file_path()] = Location(location.x, location.y)
+                if Settings.location_priors:
+                    record_location(pattern, location)
         elif match_type is MatchTemplateType.MULTIPLE:
-            loc = np.where(res >= precision)
-            for pt in zip(*loc[::-1]):
-                save_img_location = Location(pt[0], pt[1])
-                location = Location(pt[0] + region.x, pt[1] + region.y)
-                save_img_location_list.append(save_img_location)
-                locations_list.append(location)
+            res = _get_correlation_map(stack_array, pattern_array)
+            for x, y, score in _non_max_suppression(res, precision, (p_width, p_height), max_results):
+                save_img_location_list.append(Location(x, y))
+                matches.append(Match(x + region.x, y + region.y, p_width, p_height, score, stack_image.frame_id))
 
-        save_debug_image(pattern, stack_image, save_img_location_list)
+        if len(matches) > 0:
+            if _is_multi_scale_search(pattern):
+                _discovered_scales[(stack_image.screen_id, pattern.get_filename())] = scale
+                logger.debug('Found %s at scale %s' % (pattern.get_filename(), scale))
+            break
 
-    except ScreenshotError:
-        logger.warning('Screenshot failed.')
-        return []
+    save_debug_image(pattern, stack_image, save_img_location_list)
+
+    return matches
+
+
+def register_backend(name: str, backend):
+    """Register a matching engine that Patterns can select by name, with Pattern.backend() or
+    Settings.search_backend.
+
+    :param name: Backend name.
+    :param backend: Function with the signature of _match_template_in_image, searching a Pattern in one screenshot and
+    returning a list of Match objects in screen coordinates, best first.
+    :return: None.
+    """
+    _backends[name] = backend
+
+
+def _get_backend_name(pattern: Pattern) -> str:
+    """Returns the name of the backend a pattern is searched with, falling back to Settings.search_backend."""
+    if pattern.search_backend is None:
+        return Settings.search_backend
+    return pattern.search_backend
+
+
+def _get_backend(pattern: Pattern):
+    name = _get_backend_name(pattern)
+    if name not in _backends:
+        logger.warning('Unknown search backend %s, using template matching' % name)
+        return _backends['template']
+    return _backends[name]
+
+
+def _auto_match_in_image(pattern: Pattern, stack_image: ScreenshotImage, region: Rectangle,
+                         match_type: MatchTemplateType = MatchTemplateType.SINGLE, max_results: int = None,
+                         correlation_cache: dict = None):
+    """Template matching, falling back to keypoint matching in the same screenshot when it finds nothing, for
+    patterns that may be displayed scaled or slightly transformed."""
+    matches = _match_template_in_image(pattern, stack_image, region, match_type, max_results, correlation_cache)
+    if len(matches) == 0:
+        matches = feature_match_in_image(pattern, stack_image, region, match_type, max_results)
+    return matches
+
+
+def _is_multi_scale_search(pattern: Pattern) -> bool:
+    """Returns True if the pattern may be searched at other scales, falling back to Settings.multi_scale_search."""
+    if pattern.multi_scale_search is None:
+        return Settings.multi_scale_search
+    return pattern.multi_scale_search
+
+
+def _get_search_scales(pattern: Pattern, stack_image: ScreenshotImage) -> list:
+    """Returns the scales to try for a pattern, in order.
+
+    Once a scale has matched on a display, the pattern family (all the resolutions of the same image) is searched
+    there at that scale only, and at its native scale as a fallback.
+    """
+    if not _is_multi_scale_search(pattern):
+        return [1]
+
+    discovered_scale = _discovered_scales.get((stack_image.screen_id, pattern.get_filename()))
+    if discovered_scale is not None:
+        return [discovered_scale] if discovered_scale == 1 else [discovered_scale, 1]
+    return [1] + [scale for scale in Settings.search_scales if scale != 1]
+
+
+def _get_match_pool() -> ThreadPoolExecutor:
+    """Returns the thread pool used for tiled searches, recreating it when Settings.match_thread_count changes."""
+    global _match_pool, _match_pool_size
+    with _match_pool_lock:
+        if _match_pool is None or _match_pool_size != Settings.match_thread_count:
+            if _match_pool is not None:
+                _match_pool.shutdown(wait=False)
+            _match_pool = ThreadPoolExecutor(max_workers=Settings.match_thread_count, thread_name_prefix='iris_match')
+            _match_pool_size = Settings.match_thread_count
+        return _match_pool
+
+
+def _get_correlation_map(stack_array, pattern_array):
+    """Correlates the pattern over the whole screenshot.
+
+    When Settings.match_thread_count is 2 or more, screenshots with more than TILE_ROWS result rows are split in
+    horizontal tiles of TILE_ROWS result rows, each one overlapping the next by the pattern height, and the tiles are
+    correlated on a thread pool. Otherwise the map is a single cv2.matchTemplate call over the whole screenshot.
+
+    cv2.matchTemplate normalizes each window with sums whose float rounding depends on the extent of the correlated
+    image, so a tiled map is not bit-identical to the single call. The difference stays below TILE_TOLERANCE: it is
+    largest on near-flat windows, where the normalization divides by a deviation close to zero, and about ten times
+    smaller on windows scoring above 0.5. The best location is the same. The tile layout only depends on the image
+    sizes, so the tiled map is identical for every thread count of 2 or more.
+
+    :param stack_array: Screenshot array.
+    :param pattern_array: Pattern array, with the same number of channels as stack_array.
+    :return: Correlation map, as returned by cv2.matchTemplate.
+    """
+    if Settings.statistical_prefilter:
+        res = _prefiltered_correlation_map(stack_array, pattern_array)
+        if res is not None:
+            return res
+
+    if Settings.match_thread_count is None or Settings.match_thread_count < 2:
+        return cv2.matchTemplate(stack_array, pattern_array, FIND_METHOD)
+
+    p_height, p_width = pattern_array.shape[:2]
+    res_height = stack_array.shape[0] - p_height + 1
+    res_width = stack_array.shape[1] - p_width + 1
+    if res_height <= TILE_ROWS:
+        return cv2.matchTemplate(stack_array, pattern_array, FIND_METHOD)
+
+    res = np.empty((res_height, res_width), dtype=np.float32)
+
+    def match_tile(row):
+        tile = stack_array[row:row + TILE_ROWS + p_height - 1]
+        res[row:row + TILE_ROWS] = cv2.matchTemplate(tile, pattern_array, FIND_METHOD)
+
+    list(_get_match_pool().map(match_tile, range(0, res_height, TILE_ROWS)))
+    return res
+
+
+def _get_incremental_correlation_map(stack_array, pattern_array, correlation_cache: dict, cache_key):
+    """Correlates the pattern over a screenshot, reusing the map computed for the previous screenshot of the same
+    area where the screen did not change.
+
+    :param stack_array: Screenshot array.
+    :param pattern_array: Pattern array, with the same number of channels as stack_array.
+    :param correlation_cache: Dict of (screenshot array, correlation map) pairs, updated with this screenshot.
+    :param cache_key: Key of the searched area in correlation_cache.
+    :return: Correlation map, as returned by cv2.matchTemplate.
+    """
+    res = None
+    previous = correlation_cache.get(cache_key)
+    if previous is not None and previous[0].shape == stack_array.shape:
+        res = _update_correlation_map(previous[0], previous[1], stack_array, pattern_array)
+    if res is None:
+        res = _get_correlation_map(stack_array, pattern_array)
+    correlation_cache[cache_key] = stack_array, res
+    return res
+
+
+def _update_correlation_map(previous_array, previous_res, stack_array, pattern_array):
+    """Updates a correlation map in place for a new screenshot of the same area.
+
+    The screenshots are compared on a grid of DIRTY_CELL_SIZE pixels, and each group of changed cells is correlated
+    again, grown up and left by the pattern size since every window overlapping a changed pixel has a new score.
+
+    Like a tile of _get_correlation_map, a box correlated on its own is not bit-identical to the same windows of a
+    full correlation, so the updated map differs from a full correlation of stack_array by up to TILE_TOLERANCE, and
+    about ten times less on windows scoring above 0.5.
+
+    :param previous_array: Screenshot array previous_res was computed for.
+    :param previous_res: Correlation map of previous_array.
+    :param stack_array: New screenshot array, with the same shape as previous_array.
+    :param pattern_array: Pattern array, with the same number of channels as stack_array.
+    :return: Updated correlation map, or None if too much of the screen changed for an update to pay off.
+    """
+    changed = cv2.absdiff(previous_array, stack_array)
+    if changed.ndim == 3:
+        changed = changed.max(axis=2)
+    s_height, s_width = changed.shape
+    rows = np.arange(0, s_height, DIRTY_CELL_SIZE)
+    cols = np.arange(0, s_width, DIRTY_CELL_SIZE)
+    dirty = (np.maximum.reduceat(np.maximum.reduceat(changed, rows, axis=0), cols, axis=1) > 0).astype(np.uint8)
+
+    coverage = np.count_nonzero(dirty) / dirty.size
+    if coverage > DIRTY_MAX_COVERAGE:
+        return None
+
+    p_height, p_width = pattern_array.shape[:2]
+    res_height, res_width = previous_res.shape
+    count, labels, stats, centroids = cv2.connectedComponentsWithStats(dirty, connectivity=8)
+    for x, y, width, height, area in stats[1:]:
+        x_0 = max(0, x * DIRTY_CELL_SIZE - p_width + 1)
+        y_0 = max(0, y * DIRTY_CELL_SIZE - p_height + 1)
+        x_1 = min(res_width, (x + width) * DIRTY_CELL_SIZE)
+        y_1 = min(res_height, (y + height) * DIRTY_CELL_SIZE)
+        if x_1 > x_0 and y_1 > y_0:
+            box = stack_array[y_0:y_1 + p_height - 1, x_0:x_1 + p_width - 1]
+            previous_res[y_0:y_1, x_0:x_1] = cv2.matchTemplate(box, pattern_array, FIND_METHOD)
+    logger.debug('Incremental search: %s changed area(s), %.1f%% of the screenshot' % (count - 1, coverage * 100))
+    return previous_res
+
+
+def _prefiltered_correlation_map(stack_array, pattern_array):
+    """Correlates the pattern only where the screenshot is not flat.
+
+    The normalized correlation of a textured pattern over a window of constant color is 0, whatever the similarity
+    asked for, so those windows are rejected without running cv2.matchTemplate. Cell sums and squared sums are read
+    from the integral images of the screenshot on a grid of PREFILTER_CELL_SIZE pixels, which gives the mean and
+    variance of every cell. A block of candidate positions is rejected when every cell its windows can touch has zero
+    variance and the same mean. The remaining blocks are grouped in boxes and correlated, the rest of the map is 0.
+
+    :param stack_array: Screenshot array.
+    :param pattern_array: Pattern array, with the same number of channels as stack_array.
+    :return: Correlation map, or None if the pattern is flat in every channel, which cv2.matchTemplate scores 1
+    everywhere, or if too much of the screenshot survives the prefilter.
+    """
+    if np.all(pattern_array.min(axis=(0, 1)) == pattern_array.max(axis=(0, 1))):
+        return None
+
+    p_height, p_width = pattern_array.shape[:2]
+    s_height, s_width = stack_array.shape[:2]
+    res_height, res_width = s_height - p_height + 1, s_width - p_width + 1
+    cell = PREFILTER_CELL_SIZE
+
+    sums, square_sums = cv2.integral2(stack_array, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    rows = np.append(np.arange(0, s_height, cell), s_height)
+    cols = np.append(np.arange(0, s_width, cell), s_width)
+
+    def get_cell_sums(table):
+        grid = table[rows][:, cols]
+        return grid[1:, 1:] - grid[:-1, 1:] - grid[1:, :-1] + grid[:-1, :-1]
+
+    counts = np.diff(rows)[:, None] * np.diff(cols)[None, :]
+    cell_sums = get_cell_sums(sums)
+    cell_square_sums = get_cell_sums(square_sums)
+    if cell_sums.ndim == 3:
+        counts = counts[..., None]
+    variances = counts * cell_square_sums - cell_sums * cell_sums
+    means = cell_sums / counts
+    if variances.ndim == 3:
+        variances = variances.sum(axis=2)
+        means = means.dot([1, 256, 65536])
+
+    # Windows starting in a cell can reach the cells up to the pattern size further right and down.
+    kernel = np.ones(((cell + p_height - 2) // cell + 1, (cell + p_width - 2) // cell + 1), np.uint8)
+    flat = cv2.erode((variances == 0).astype(np.uint8), kernel, anchor=(0, 0), borderType=cv2.BORDER_CONSTANT,
+                     borderValue=1)
+    means = means.astype(np.float32)
+    lowest = cv2.erode(means, kernel, anchor=(0, 0), borderType=cv2.BORDER_REPLICATE)
+    highest = cv2.dilate(means, kernel, anchor=(0, 0), borderType=cv2.BORDER_REPLICATE)
+
+    grid_height, grid_width = -(-res_height // cell), -(-res_width // cell)
+    survivors = ((flat == 0) | (lowest != highest))[:grid_height, :grid_width].astype(np.uint8)
+    coverage = np.count_nonzero(survivors) / survivors.size
+    logger.debug('Prefilter kept %.1f%% of the screenshot' % (coverage * 100))
+    if coverage > PREFILTER_MAX_COVERAGE:
+        return None
+
+    res = np.zeros((res_height, res_width), dtype=np.float32)
+    count, labels, stats, centroids = cv2.connectedComponentsWithStats(survivors, connectivity=8)
+    for x, y, width, height, area in stats[1:]:
+        x_0, y_0 = x * cell, y * cell
+        x_1, y_1 = min(res_width, (x + width) * cell), min(res_height, (y + height) * cell)
+        box = stack_array[y_0:y_1 + p_height - 1, x_0:x_1 + p_width - 1]
+        res[y_0:y_1, x_0:x_1] = cv2.matchTemplate(box, pattern_array, FIND_METHOD)
+    return res
+
+
+def _window_match_template(stack_array, pattern_array, region: Rectangle, location: Location):
+    """Search a window that extends one pattern size in every direction from a known location.
+
+    :param stack_array: Screenshot array.
+    :param pattern_array: Pattern array, with the same number of channels as stack_array.
+    :param Region region: Region the screenshot was taken from.
+    :param Location location: Expected location in screen coordinates.
+    :return: Pair of max value and max location in screenshot coordinates, or None if the window is off-region.
+    """
+    p_height, p_width = pattern_array.shape[:2]
+    s_height, s_width = stack_array.shape[:2]
+    expected_x = int(location.x - region.x)
+    expected_y = int(location.y - region.y)
+    x_0 = max(0, expected_x - p_width)
+    y_0 = max(0, expected_y - p_height)
+    x_1 = min(s_width, expected_x + 2 * p_width)
+    y_1 = min(s_height, expected_y + 2 * p_height)
+    if x_1 - x_0 < p_width or y_1 - y_0 < p_height:
+        return None
+
+    window = stack_array[y_0:y_1, x_0:x_1]
+    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(cv2.matchTemplate(window, pattern_array, FIND_METHOD))
+    return max_val, (max_loc[0] + x_0, max_loc[1] + y_0)
+
+
+def _locality_match_template(pattern: Pattern, stack_array, pattern_array, region: Rectangle, precision: float):
+    """Search a small window around the location where the pattern was last found.
+
+    Hits and lookups are counted so the hit rate of this fast path shows up in the debug log.
+
+    :param Pattern pattern: Image details.
+    :param stack_array: Screenshot array.
+    :param pattern_array: Pattern array, with the same number of channels as stack_array.
+    :param Region region: Region the screenshot was taken from.
+    :param precision: Minimum similarity.
+    :return: Pair of max value and max location in screenshot coordinates, or None on a miss.
+    """
+    last_location = _last_match_locations.get(pattern.get_file_path())
+    if last_location is None:
+        return None
+
+    window_match = _window_match_template(stack_array, pattern_array, region, last_location)
+    if window_match is None:
+        return None
+
+    _locality_stats['lookups'] += 1
+    is_hit = window_match[0] >= precision
+    if is_hit:
+        _locality_stats['hits'] += 1
+    logger.debug('Locality search %s for %s - hit rate %s/%s' % ('hit' if is_hit else 'miss', pattern.get_filename(),
+                                                                  _locality_stats['hits'], _locality_stats['lookups']))
+    return window_match if is_hit else None
+
+
+def _prior_match_template(pattern: Pattern, stack_array, pattern_array, region: Rectangle, precision: float):
+    """Search small windows around the locations where the pattern was found in previous runs.
+
+    :param Pattern pattern: Image details.
+    :param stack_array: Screenshot array.
+    :param pattern_array: Pattern array, with the same number of channels as stack_array.
+    :param Region region: Region the screenshot was taken from.
+    :param precision: Minimum similarity.
+    :return: Pair of max value and max location in screenshot coordinates, or None on a miss.
+    """
+    last_location = _last_match_locations.get(pattern.get_file_path())
+    for prior_location in get_prior_locations(pattern, PRIOR_WINDOWS):
+        if last_location is not None and (prior_location.x, prior_location.y) == (last_location.x, last_location.y):
+            continue
+        window_match = _window_match_template(stack_array, pattern_array, region, prior_location)
+        if window_match is not None and window_match[0] >= precision:
+            logger.debug('Prior location hit for %s at %s' % (pattern.get_filename(), prior_location))
+            return window_match
+    return None
+
+
+def _get_exact_signature(pattern: Pattern, pattern_array, scale: float):
+    """Picks the anchor pixels used by the exact search: the pixels whose colors are the rarest in the pattern.
+
+    Signatures are cached per image and scale. Flat patterns get no signature: the correlation search scores them as
+    a match anywhere, and they must keep going through it to return the same location as before.
+
+    :return: List of (y, x) anchor coordinates, or None for a flat pattern.
+    """
+    key = (pattern.get_file_path(), scale, pattern_array.ndim)
+    if key not in _exact_signatures:
+        packed = pattern_array.astype(np.uint32)
+        if packed.ndim == 3:
+            packed = (packed[..., 0] << 16) | (packed[..., 1] << 8) | packed[..., 2]
+        values, inverse, counts = np.unique(packed, return_inverse=True, return_counts=True)
+        if len(values) < 2:
+            _exact_signatures[key] = None
+        else:
+            rarity = counts[inverse.reshape(-1)]
+            order = np.argsort(rarity, kind='stable')[:EXACT_ANCHOR_COUNT]
+            ys, xs = np.unravel_index(order, packed.shape)
+            _exact_signatures[key] = list(zip(ys.tolist(), xs.tolist()))
+    return _exact_signatures[key]
+
+
+def _exact_match_template(pattern: Pattern, stack_array, pattern_array, scale: float = 1):
+    """Search for a pixel-identical occurrence of the pattern.
+
+    Candidate positions are the ones where the first anchor pixels of the pattern signature match, computed as
+    whole-screenshot masks. The other anchors then filter the few remaining candidates, and the survivors are
+    compared in full. The first occurrence in reading order is returned, like cv2.minMaxLoc does.
+
+    :param Pattern pattern: Image details.
+    :param stack_array: Screenshot array.
+    :param pattern_array: Pattern array, with the same number of channels as stack_array.
+    :param scale: Scale of pattern_array, used to cache the signature.
+    :return: Pair of max value and max location, or None if there is no identical occurrence.
+    """
+    anchors = _get_exact_signature(pattern, pattern_array, scale)
+    if anchors is None:
+        return None
+
+    p_height, p_width = pattern_array.shape[:2]
+    r_height = stack_array.shape[0] - p_height + 1
+    r_width = stack_array.shape[1] - p_width + 1
+
+    mask = None
+    for a_y, a_x in anchors[:EXACT_MASK_ANCHORS]:
+        value = pattern_array[a_y, a_x]
+        value = tuple(int(channel) for channel in value) if pattern_array.ndim == 3 else int(value)
+        anchor_mask = cv2.inRange(stack_array[a_y:a_y + r_height, a_x:a_x + r_width], value, value)
+        mask = anchor_mask if mask is None else cv2.bitwise_and(mask, anchor_mask)
+
+    ys, xs = np.nonzero(mask)
+    for a_y, a_x in anchors[EXACT_MASK_ANCHORS:]:
+        keep = stack_array[ys + a_y, xs + a_x] == pattern_array[a_y, a_x]
+        if keep.ndim == 2:
+            keep = keep.all(axis=1)
+        ys, xs = ys[keep], xs[keep]
+
+    for y, x in zip(ys, xs):
+        if np.array_equal(stack_array[y:y + p_height, x:x + p_width], pattern_array):
+            logger.debug('Exact search: %s candidate(s), match at (%s, %s)' % (len(ys), x, y))
+            return 1.0, (int(x), int(y))
+    logger.debug('Exact search: %s candidate(s), no identical match' % len(ys))
+    return None
+
+
+def _is_sub_patch_search(pattern: Pattern) -> bool:
+    """Returns True if the pattern should be searched by its sub-patch first, falling back to
+    Settings.sub_patch_search."""
+    if pattern.sub_patch_search is None:
+        return Settings.sub_patch_search
+    return pattern.sub_patch_search
+
+
+def _get_sub_patch(pattern: Pattern, pattern_array, scale: float):
+    """Picks the most distinctive SUB_PATCH_SIZE square of a large pattern.
+
+    Squares are tried by decreasing variance, at least one square side apart so that different parts of the pattern
+    are tried. The first one that does not correlate above SUB_PATCH_UNIQUENESS anywhere else in the pattern is kept,
+    so that a hit on the sub-patch points to a single pattern position. The choice is cached per image and scale.
+
+    :return: Top left (x, y) of the sub-patch in the pattern, or None if the pattern is small or has no distinctive
+    square.
+    """
+    key = (pattern.get_file_path(), scale, pattern_array.ndim)
+    if key not in _sub_patches:
+        _sub_patches[key] = None
+        p_height, p_width = pattern_array.shape[:2]
+        if min(p_width, p_height) >= SUB_PATCH_MIN_PATTERN_SIZE:
+            gray = pattern_array if pattern_array.ndim == 2 else cv2.cvtColor(pattern_array, cv2.COLOR_RGB2GRAY)
+            gray = gray.astype(np.float32)
+            size = (SUB_PATCH_SIZE, SUB_PATCH_SIZE)
+            mean = cv2.boxFilter(gray, -1, size, anchor=(0, 0), borderType=cv2.BORDER_CONSTANT)
+            square_mean = cv2.boxFilter(gray * gray, -1, size, anchor=(0, 0), borderType=cv2.BORDER_CONSTANT)
+            variance = (square_mean - mean * mean)[:p_height - SUB_PATCH_SIZE + 1, :p_width - SUB_PATCH_SIZE + 1]
+
+            suppress_size = (2 * SUB_PATCH_SIZE, 2 * SUB_PATCH_SIZE)
+            for x, y in _get_peak_locations(variance, np.finfo(np.float32).eps, SUB_PATCH_CANDIDATES, suppress_size):
+                sub_patch = pattern_array[y:y + SUB_PATCH_SIZE, x:x + SUB_PATCH_SIZE]
+                res = cv2.matchTemplate(pattern_array, sub_patch, FIND_METHOD)
+                half = SUB_PATCH_SIZE // 2
+                res[max(0, y - half):y + half + 1, max(0, x - half):x + half + 1] = -1
+                if res.max() < SUB_PATCH_UNIQUENESS:
+                    _sub_patches[key] = (int(x), int(y))
+                    break
+        logger.debug('Sub-patch for %s at scale %s: %s' % (pattern.get_filename(), scale, _sub_patches[key]))
+    return _sub_patches[key]
+
+
+def _sub_patch_match_template(pattern: Pattern, stack_array, pattern_array, scale: float, precision: float):
+    """Searches the screenshot for the pattern sub-patch, then verifies the best candidates with the full pattern.
+
+    Sub-patch peaks are accepted SUB_PATCH_SIMILARITY_MARGIN below the pattern similarity, since a small square
+    correlates less reliably than the whole pattern. Each candidate is verified with a correlation of the full
+    pattern over a window SUB_PATCH_SLACK pixels larger than it on each side.
+
+    :param Pattern pattern: Image details.
+    :param stack_array: Screenshot array.
+    :param pattern_array: Pattern array, with the same number of channels as stack_array.
+    :param scale: Scale of pattern_array, used to cache the sub-patch.
+    :param precision: Minimum similarity.
+    :return: Pair of max value and max location, or None if no candidate is verified.
+    """
+    sub_patch_location = _get_sub_patch(pattern, pattern_array, scale)
+    if sub_patch_location is None:
+        return None
+
+    sub_x, sub_y = sub_patch_location
+    sub_patch = pattern_array[sub_y:sub_y + SUB_PATCH_SIZE, sub_x:sub_x + SUB_PATCH_SIZE]
+    res = _get_correlation_map(stack_array, sub_patch)
+    candidates = _get_peak_locations(res, precision - SUB_PATCH_SIMILARITY_MARGIN, SUB_PATCH_CANDIDATES,
+                                     (SUB_PATCH_SIZE, SUB_PATCH_SIZE))
+
+    p_height, p_width = pattern_array.shape[:2]
+    s_height, s_width = stack_array.shape[:2]
+    best_match = None
+    for x, y in candidates:
+        x_0 = min(max(0, x - sub_x - SUB_PATCH_SLACK), s_width - p_width)
+        y_0 = min(max(0, y - sub_y - SUB_PATCH_SLACK), s_height - p_height)
+        window = stack_array[y_0:y_0 + p_height + 2 * SUB_PATCH_SLACK, x_0:x_0 + p_width + 2 * SUB_PATCH_SLACK]
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(cv2.matchTemplate(window, pattern_array, FIND_METHOD))
+        if max_val >= precision and (best_match is None or max_val > best_match[0]):
+            best_match = max_val, (max_loc[0] + x_0, max_loc[1] + y_0)
+
+    logger.debug('Sub-patch search: %s candidate(s), %s' % (len(candidates), 'verified' if best_match else 'no match'))
+    return best_match
+
+
+def _is_pyramid_search(pattern: Pattern) -> bool:
+    """Returns True if the pattern should be searched coarse-to-fine, falling back to Settings.pyramid_search."""
+    if pattern.pyramid_search is None:
+        return Settings.pyramid_search
+    return pattern.pyramid_search
+
+
+def _get_pyramid_levels(pattern_array) -> int:
+    """Returns how many times the pattern can be halved while staying large enough to be recognizable."""
+    height, width = pattern_array.shape[:2]
+    levels = 0
+    while levels < PYRAMID_MAX_LEVELS and min(width, height) >> (levels + 1) >= PYRAMID_MIN_PATTERN_SIZE:
+        levels += 1
+    return levels
+
+
+def _get_best_location(res):
+    """Returns the best value of a correlation map and its location.
+
+    Identical instances of a pattern score a few 1e-6 apart depending on the area correlated, so values within
+    SCORE_TIE_TOLERANCE of the best one are ties, won by the first location in reading order (lowest y, then x).
+
+    :param res: Correlation map returned by cv2.matchTemplate.
+    :return: Pair of max value and max location.
+    """
+    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+    ys, xs = np.nonzero(res >= max_val - SCORE_TIE_TOLERANCE)
+    if len(ys) == 0:
+        return max_val, max_loc
+    return float(res[ys[0], xs[0]]), (int(xs[0]), int(ys[0]))
+
+
+def _get_peak_locations(res, threshold: float, count: int, suppress_size: (int, int)) -> list:
+    """Returns up to count best locations from a correlation map, blanking the neighbourhood of each one found.
+
+    :param res: Correlation map returned by cv2.matchTemplate.
+    :param threshold: Minimum correlation value of a peak.
+    :param count: Maximum number of peaks.
+    :param suppress_size: Width and height of the area cleared around each peak.
+    :return: List of (x, y) tuples, best first.
+    """
+    res = res.copy()
+    s_width, s_height = suppress_size
+    peaks = []
+    while len(peaks) < count:
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+        if max_val < threshold:
+            break
+        peaks.append(max_loc)
+        x, y = max_loc
+        res[max(0, y - s_height // 2):y + s_height // 2 + 1, max(0, x - s_width // 2):x + s_width // 2 + 1] = -1
+    return peaks
+
+
+def _non_max_suppression(res, threshold: float, pattern_size: (int, int), max_results: int = None) -> list:
+    """Reduces a correlation map to one scored location per match, so that no two returned matches overlap.
+
+    Only the local maxima above threshold are considered, and every kept match removes all its overlapping
+    neighbours at once, so the cost grows with the number of matches rather than with the number of pixels above
+    threshold.
+
+    :param res: Correlation map returned by cv2.matchTemplate.
+    :param threshold: Minimum correlation value of a match.
+    :param pattern_size: Width and height of the pattern.
+    :param max_results: Maximum number of matches to return, None for all of them.
+    :return: List of (x, y, score) tuples, best scores first.
+    """
+    peaks = (res >= threshold) & (res == cv2.dilate(res, np.ones((3, 3), np.uint8)))
+    ys, xs = np.nonzero(peaks)
+    scores = res[ys, xs]
+    order = np.argsort(-scores, kind='stable')
+    xs, ys, scores = xs[order], ys[order], scores[order]
+
+    p_width, p_height = pattern_size
+    results = []
+    while len(xs) > 0 and (max_results is None or len(results) < max_results):
+        results.append((int(xs[0]), int(ys[0]), float(scores[0])))
+        keep = (np.abs(xs - xs[0]) >= p_width) | (np.abs(ys - ys[0]) >= p_height)
+        xs, ys, scores = xs[keep], ys[keep], scores[keep]
+    return results
 
-    return locations_list
+
+def _pyramid_match_template(stack_array, pattern_array, precision: float):
+    """Coarse-to-fine search: correlate downscaled copies of the screenshot and pattern, then check only the best
+    candidates at full resolution.
+
+    A hit is only reported if it reaches precision at full resolution, so the caller falls back to the exhaustive
+    search whenever this returns None. Ties are broken in reading order like _get_best_location, so duplicate
+    instances give the same location as the exhaustive search.
+
+    :param stack_array: Screenshot array.
+    :param pattern_array: Pattern array, with the same number of channels as stack_array.
+    :param precision: Minimum similarity.
+    :return: Pair of max value and max location, or None if no candidate reached precision.
+    """
+    levels = _get_pyramid_levels(pattern_array)
+    if levels == 0:
+        return None
+
+    small_stack = stack_array
+    small_pattern = pattern_array
+    for _ in range(levels):
+        small_stack = cv2.pyrDown(small_stack)
+        small_pattern = cv2.pyrDown(small_pattern)
+
+    sp_height, sp_width = small_pattern.shape[:2]
+    if small_stack.shape[0] < sp_height or small_stack.shape[1] < sp_width:
+        return None
+
+    res = cv2.matchTemplate(small_stack, small_pattern, FIND_METHOD)
+    candidates = _get_peak_locations(res, precision - PYRAMID_SIMILARITY_MARGIN, PYRAMID_CANDIDATES,
+                                     (sp_width, sp_height))
+
+    factor = 2 ** levels
+    p_height, p_width = pattern_array.shape[:2]
+    s_height, s_width = stack_array.shape[:2]
+    refined = []
+    for c_x, c_y in candidates:
+        x_0 = max(0, (c_x - 1) * factor)
+        y_0 = max(0, (c_y - 1) * factor)
+        x_1 = min(s_width, (c_x + 2) * factor + p_width)
+        y_1 = min(s_height, (c_y + 2) * factor + p_height)
+        window = stack_array[y_0:y_1, x_0:x_1]
+        max_val, max_loc = _get_best_location(cv2.matchTemplate(window, pattern_array, FIND_METHOD))
+        refined.append((max_val, (max_loc[0] + x_0, max_loc[1] + y_0)))
+    if len(refined) == 0:
+        return None
+
+    best_val = max(value for value, location in refined)
+    ties = [(location[1], location[0], value) for value, location in refined
+            if value >= best_val - SCORE_TIE_TOLERANCE]
+    logger.debug('Pyramid search: %s level(s), %s candidate(s), best value %s' % (levels, len(candidates), best_val))
+    if len(ties) == PYRAMID_CANDIDATES:
+        # Every candidate is a tie, more instances may have been left out: let the exhaustive search pick the first.
+        return None
+    y, x, value = min(ties)
+    if value >= precision:
+        return value, (x, y)
+    return None
 
 
 def _region_in_display_list(region=None):
@@ -118,13 +937,149 @@ def _region_in_display_list(region=None):
             return index
 
 
+def _get_intersection(first: Rectangle, second: Rectangle) -> Rectangle or None:
+    """Returns the overlapping part of two rectangles, or None if they do not overlap."""
+    x_0 = max(first.x, second.x)
+    y_0 = max(first.y, second.y)
+    x_1 = min(first.x + first.width, second.x + second.width)
+    y_1 = min(first.y + first.height, second.y + second.height)
+    if x_1 <= x_0 or y_1 <= y_0:
+        return None
+    return Rectangle(x_0, y_0, x_1 - x_0, y_1 - y_0)
+
+
+def _get_search_regions(region: Rectangle = None, overlap: (int, int) = (0, 0)) -> list:
+    """Splits a search area into the parts that lie on each display, so every part is captured at its own scale.
+
+    Without a region, the primary display is searched, or every display if Settings.search_all_displays is set. A
+    region covering several displays of the same scale is captured whole, so a pattern straddling their boundary is
+    still found. Otherwise each part is grown by overlap into the neighbouring displays for the same reason.
+
+    :param Region region: Region object.
+    :param overlap: Width and height by which the parts of a region covering displays of different scales overlap.
+    :return: List of (Rectangle, screen id) pairs.
+    """
+    if region is None:
+        if Settings.search_all_displays:
+            return [(display.bounds, index) for index, display in enumerate(DisplayCollection)]
+        return [(DisplayCollection[0].bounds, 0)]
+
+    screen_id = _region_in_display_list(region)
+    if screen_id is not None:
+        return [(region, screen_id)]
+
+    parts = []
+    for index, display in enumerate(DisplayCollection):
+        intersection = _get_intersection(region, display.bounds)
+        if intersection is not None:
+            parts.append((intersection, index))
+    if len(parts) == 0:
+        return [(region, None)]
+    if len(set(DisplayCollection[index].scale for part, index in parts)) == 1:
+        return [(region, parts[0][1])]
+
+    o_width, o_height = overlap
+    return [(_get_intersection(region, Rectangle(part.x - o_width, part.y - o_height, part.width + 2 * o_width,
+                                                 part.height + 2 * o_height)), index) for part, index in parts]
+
+
+def _get_overlap(patterns: list = None) -> (int, int):
+    """Returns the largest width and height of the searched patterns, ignoring text."""
+    sizes = [pattern.get_size() for pattern in patterns or [] if isinstance(pattern, Pattern)]
+    if len(sizes) == 0:
+        return 0, 0
+    return max(width for width, height in sizes), max(height for width, height in sizes)
+
+
+def _get_screenshots(region: Rectangle = None, patterns: list = None) -> list or None:
+    """Captures a search area, one screenshot per display it covers.
+
+    :param Region region: Region object.
+    :param patterns: List of the searched Pattern objects, used to overlap the parts of a region covering displays
+    of different scales.
+    :return: List of (Rectangle, ScreenshotImage) pairs, or None if a screenshot failed.
+    """
+    frames = []
+    for part, screen_id in _get_search_regions(region, _get_overlap(patterns)):
+        try:
+            frames.append((part, ScreenshotImage(region=part, screen_id=screen_id)))
+        except ScreenshotError:
+            logger.warning('Screenshot failed.')
+            return None
+    return frames
+
+
+def capture_region(region: Rectangle = None) -> ScreenshotImage:
+    """Captures a Region or the primary display as a single screenshot, at the scale of the display it lies on.
+
+    A region covering displays of different scales is captured at the scale of the first of them.
+
+    :param Region region: Region object.
+    :return: ScreenshotImage object, or raise ScreenshotError.
+    """
+    parts = _get_search_regions(region)
+    if len(parts) == 1:
+        return ScreenshotImage(region=parts[0][0], screen_id=parts[0][1])
+    return ScreenshotImage(region=region, screen_id=parts[0][1])
+
+
+def _get_frames_fingerprint(frames: list, patterns: list = None):
+    """Returns a fingerprint of all the screenshots in a capture.
+
+    The color pixels are checked when one of the patterns is matched in color, so that a change of color with the
+    same gray level is not mistaken for an unchanged screen.
+
+    :param frames: List of (Rectangle, ScreenshotImage) pairs, as returned by _get_screenshots.
+    :param patterns: List of the searched Pattern objects, text is ignored.
+    :return: Tuple of the fingerprints of the screenshots.
+    """
+    if any(isinstance(pattern, Pattern) and pattern.similarity == 0.99 for pattern in patterns or []):
+        return tuple(stack_image.get_color_fingerprint() for part, stack_image in frames)
+    return tuple(stack_image.get_fingerprint() for part, stack_image in frames)
+
+
+def _wait_for_next_scan(scan_start: datetime.datetime, end_time: datetime.datetime):
+    """Sleeps for the rest of the current polling tick, so searches run at most Settings.wait_scan_rate times per
+    second."""
+    if not Settings.wait_scan_rate or Settings.wait_scan_rate <= 0:
+        return
+    next_scan = min(scan_start + datetime.timedelta(seconds=1 / Settings.wait_scan_rate), end_time)
+    sleep_time = (next_scan - datetime.datetime.now()).total_seconds()
+    if sleep_time > 0:
+        time.sleep(sleep_time)
+
+
+def check_sentinels(frames: list, waited_patterns: list = None):
+    """Search the registered sentinel patterns in already captured screenshots.
+
+    :param frames: List of (Rectangle, ScreenshotImage) pairs, as returned by _get_screenshots.
+    :param waited_patterns: List of Pattern objects being waited for, never treated as sentinels.
+    :return: None, or raise SentinelError when a sentinel is visible.
+    """
+    waited_paths = set(pattern.get_file_path() for pattern in waited_patterns or [])
+    for sentinel, message in get_sentinels():
+        if sentinel.get_file_path() in waited_paths:
+            continue
+        matches = _match_template_in_frames(sentinel, frames, MatchTemplateType.SINGLE)
+        if len(matches) > 0:
+            description = message if message is not None else 'Sentinel %s appeared' % sentinel.get_filename()
+            if len(waited_paths) > 0:
+                description += ' while waiting for %s' % ', '.join(
+                    pattern.get_filename() for pattern in waited_patterns)
+            raise SentinelError('%s (at %s, %s, score %.2f)' % (description, matches[0].x, matches[0].y,
+                                                                matches[0].score))
+
+
 def image_find(pattern, timeout=None, region=None):
     """ Search for an image in a Region or full screen.
 
+    The search is skipped on ticks where the screen did not change since the previous one, and only the changed areas
+    are correlated again on the other ticks.
+
     :param Pattern pattern: Name of the searched image.
     :param timeout: Number as maximum waiting time in seconds.
     :param Region region: Region object.
-    :return: Location.
+    :return: Match object, or None.
     """
     if not _is_pattern_size_correct(pattern, region):
         return None
@@ -132,23 +1087,37 @@ def image_find(pattern, timeout=None, region=None):
     if timeout is None:
         timeout = Settings.auto_wait_timeout
 
+    last_fingerprint = None
+    correlation_cache = {}
     start_time = datetime.datetime.now()
     end_time = start_time + datetime.timedelta(seconds=timeout)
 
     while start_time < end_time:
         time_remaining = end_time - start_time
         logger.debug('Image find: {} - {} seconds remaining'.format(pattern.get_filename(), time_remaining))
-        pos = match_template(pattern, region, MatchTemplateType.SINGLE)
+        frames = _get_screenshots(region, [pattern])
+        if frames is not None:
+            fingerprint = _get_frames_fingerprint(frames, [pattern])
+            if fingerprint == last_fingerprint:
+                logger.debug('Screen unchanged, skipping search for %s' % pattern.get_filename())
+            else:
+                check_sentinels(frames, [pattern])
+                pos = _match_template_in_frames(pattern, frames, MatchTemplateType.SINGLE,
+                                                correlation_cache=correlation_cache)
+                if len(pos) == 1:
+                    return pos[0]
+                last_fingerprint = fingerprint
+        _wait_for_next_scan(start_time, end_time)
         start_time = datetime.datetime.now()
-
-        if len(pos) == 1:
-            return pos[0]
     return None
 
 
 def image_vanish(pattern: Pattern, timeout: float = None, region: Rectangle = None) -> None or bool:
     """ Search if an image is NOT in a Region or full screen.
 
+    The search is skipped on ticks where the screen did not change since the previous one, and only the changed areas
+    are correlated again on the other ticks.
+
     :param Pattern pattern: Name of the searched image.
     :param timeout: Number as maximum waiting time in seconds.
     :param Region region: Region object.
@@ -157,19 +1126,428 @@ def image_vanish(pattern: Pattern, timeout: float = None, region: Rectangle = No
     if not _is_pattern_size_correct(pattern, region):
         return None
 
-    pattern_found = True
+    if timeout is None:
+        timeout = Settings.auto_wait_timeout
 
+    pattern_found = True
+    last_fingerprint = None
+    correlation_cache = {}
     start_time = datetime.datetime.now()
     end_time = start_time + datetime.timedelta(seconds=timeout)
 
     while pattern_found and start_time < end_time:
         time_remaining = end_time - start_time
         logger.debug('Image vanish: {} - {} seconds remaining'.format(pattern.get_filename(), time_remaining))
-        image_found = match_template(pattern, region, MatchTemplateType.SINGLE)
-        if len(image_found) == 0:
-            pattern_found = False
-        else:
-            pattern_found = True
+        frames = _get_screenshots(region, [pattern])
+        if frames is not None:
+            fingerprint = _get_frames_fingerprint(frames, [pattern])
+            if fingerprint == last_fingerprint:
+                logger.debug('Screen unchanged, skipping search for %s' % pattern.get_filename())
+            else:
+                check_sentinels(frames, [pattern])
+                image_found = _match_template_in_frames(pattern, frames, MatchTemplateType.SINGLE,
+                                                        correlation_cache=correlation_cache)
+                pattern_found = len(image_found) > 0
+                last_fingerprint = fingerprint
+        if pattern_found:
+            _wait_for_next_scan(start_time, end_time)
         start_time = datetime.datetime.now()
 
     return None if pattern_found else True
+
+
+def image_find_any(patterns: list, timeout: float = None, region: Rectangle = None):
+    """Search for the first of several images that appears in a Region or full screen.
+
+    A single screenshot is taken per polling tick and every pattern is tested against it, in the given order.
+
+    :param patterns: List of Pattern objects.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param Region region: Region object.
+    :return: Pair of the matching Pattern and its Match, or None.
+    """
+    patterns = [pattern for pattern in patterns if _is_pattern_size_correct(pattern, region)]
+    if len(patterns) == 0:
+        return None
+
+    if timeout is None:
+        timeout = Settings.auto_wait_timeout
+
+    last_fingerprint = None
+    start_time = datetime.datetime.now()
+    end_time = start_time + datetime.timedelta(seconds=timeout)
+
+    while start_time < end_time:
+        time_remaining = end_time - start_time
+        logger.debug('Image find any: {} - {} seconds remaining'.format(
+            ', '.join(pattern.get_filename() for pattern in patterns), time_remaining))
+        frames = _get_screenshots(region, patterns)
+        if frames is not None and _get_frames_fingerprint(frames, patterns) != last_fingerprint:
+            check_sentinels(frames, patterns)
+            for pattern in patterns:
+                pos = _match_template_in_frames(pattern, frames, MatchTemplateType.SINGLE)
+                if len(pos) == 1:
+                    return pattern, pos[0]
+            last_fingerprint = _get_frames_fingerprint(frames, patterns)
+        _wait_for_next_scan(start_time, end_time)
+        start_time = datetime.datetime.now()
+    return None
+
+
+def image_find_all_of(patterns: list, timeout: float = None, region: Rectangle = None):
+    """Search for several images that are all visible at the same time in a Region or full screen.
+
+    A single screenshot is taken per polling tick. The remaining patterns are skipped as soon as one of them is
+    missing from it, and that pattern is tested first on the next tick.
+
+    :param patterns: List of Pattern objects.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param Region region: Region object.
+    :return: List of (Pattern, Match) pairs in the given order, or None.
+    """
+    for pattern in patterns:
+        if not _is_pattern_size_correct(pattern, region):
+            return None
+
+    if timeout is None:
+        timeout = Settings.auto_wait_timeout
+
+    search_order = list(patterns)
+    last_fingerprint = None
+    start_time = datetime.datetime.now()
+    end_time = start_time + datetime.timedelta(seconds=timeout)
+
+    while start_time < end_time:
+        time_remaining = end_time - start_time
+        logger.debug('Image find all of: {} - {} seconds remaining'.format(
+            ', '.join(pattern.get_filename() for pattern in patterns), time_remaining))
+        frames = _get_screenshots(region, patterns)
+        if frames is not None and _get_frames_fingerprint(frames, patterns) != last_fingerprint:
+            check_sentinels(frames, patterns)
+            found = {}
+            for pattern in search_order:
+                pos = _match_template_in_frames(pattern, frames, MatchTemplateType.SINGLE)
+                if len(pos) == 0:
+                    search_order.remove(pattern)
+                    search_order.insert(0, pattern)
+                    break
+                found[id(pattern)] = pos[0]
+            if len(found) == len(patterns):
+                return [(pattern, found[id(pattern)]) for pattern in patterns]
+            last_fingerprint = _get_frames_fingerprint(frames, patterns)
+        _wait_for_next_scan(start_time, end_time)
+        start_time = datetime.datetime.now()
+    return None
+
+
+def image_wait_conditions(conditions: list, match_all: bool = False, timeout: float = None,
+                          region: Rectangle = None):
+    """Wait for one or all of several conditions on a Region or full screen.
+
+    A single screenshot is taken per polling tick and every condition is evaluated against it, image conditions
+    before text ones since OCR is much slower. The loop returns as soon as one condition is met, or when match_all is
+    True, as soon as all of them are met on the same tick. A condition that is not met ends the evaluation of the tick
+    in that case, and is evaluated first on the next one.
+
+    :param conditions: List of Pattern, String or Vanish objects.
+    :param match_all: True to wait for all the conditions, False for any of them.
+    :param timeout: Number as maximum waiting time in seconds.
+    :param Region region: Region object.
+    :return: List of (condition, result) pairs, the met condition only or all the conditions in the given order, or
+    None. The result is a Match for a Pattern, a Rectangle for a String and True for a Vanish.
+    """
+    patterns = [_get_condition_target(condition) for condition in conditions
+                if isinstance(_get_condition_target(condition), Pattern)]
+    for pattern in patterns:
+        if not _is_pattern_size_correct(pattern, region):
+            return None
+
+    if timeout is None:
+        timeout = Settings.auto_wait_timeout
+
+    search_order = _get_condition_order(conditions)
+    last_fingerprint = None
+    start_time = datetime.datetime.now()
+    end_time = start_time + datetime.timedelta(seconds=timeout)
+
+    while start_time < end_time:
+        time_remaining = end_time - start_time
+        logger.debug('Wait %s of: %s - %s seconds remaining' % ('all' if match_all else 'any', conditions,
+                                                                time_remaining))
+        frames = _get_screenshots(region, patterns)
+        if frames is not None and _get_frames_fingerprint(frames, patterns) != last_fingerprint:
+            check_sentinels(frames, patterns)
+            conditions_met = _evaluate_conditions(frames, conditions, search_order, match_all)
+            if conditions_met is not None:
+                return conditions_met
+            last_fingerprint = _get_frames_fingerprint(frames, patterns)
+        _wait_for_next_scan(start_time, end_time)
+        start_time = datetime.datetime.now()
+    return None
+
+
+def image_check_conditions(conditions: list, match_all: bool = False, region: Rectangle = None,
+                           last_fingerprint=None):
+    """Evaluate several conditions once, against a single capture of a Region or full screen.
+
+    This is one polling tick of image_wait_conditions, for callers that run their own loop.
+
+    :param conditions: List of Pattern, String or Vanish objects.
+    :param match_all: True if all the conditions must be met, False for any of them.
+    :param Region region: Region object.
+    :param last_fingerprint: Fingerprint returned by the previous call, the conditions are not evaluated again if the
+    screen did not change since.
+    :return: Pair of the result of image_wait_conditions for this capture (or None) and the capture fingerprint.
+    """
+    patterns = [_get_condition_target(condition) for condition in conditions
+                if isinstance(_get_condition_target(condition), Pattern)]
+    frames = _get_screenshots(region, patterns)
+    if frames is None:
+        return None, last_fingerprint
+    fingerprint = _get_frames_fingerprint(frames, patterns)
+    if fingerprint == last_fingerprint:
+        return None, fingerprint
+
+    check_sentinels(frames, patterns)
+    return _evaluate_conditions(frames, conditions, _get_condition_order(conditions), match_all), fingerprint
+
+
+def _evaluate_conditions(frames: list, conditions: list, search_order: list, match_all: bool):
+    """Evaluates conditions in search_order against already captured screenshots. When match_all is True, the first
+    condition that is not met is moved to the front of search_order.
+
+    :return: List of (condition, result) pairs, the met condition only or all the conditions in the given order, or
+    None.
+    """
+    met = {}
+    for condition in search_order:
+        result = _evaluate_condition(condition, frames)
+        if result is None and match_all:
+            search_order.remove(condition)
+            search_order.insert(0, condition)
+            return None
+        if result is not None:
+            if not match_all:
+                return [(condition, result)]
+            met[id(condition)] = result
+    if match_all and len(met) == len(conditions):
+        return [(condition, met[id(condition)]) for condition in conditions]
+    return None
+
+
+def _get_condition_order(conditions: list) -> list:
+    """Image conditions are evaluated before text ones, since OCR is much slower."""
+    return sorted(conditions, key=lambda condition: isinstance(_get_condition_target(condition), str))
+
+
+def _get_condition_target(condition):
+    return condition.target if isinstance(condition, Vanish) else condition
+
+
+def _evaluate_condition(condition, frames: list):
+    """Evaluates a wait condition against already captured screenshots.
+
+    :return: Match for a Pattern, Rectangle for a String, True for a Vanish, or None if the condition is not met.
+    """
+    target = _get_condition_target(condition)
+    if isinstance(target, Pattern):
+        matches = _match_template_in_frames(target, frames, MatchTemplateType.SINGLE)
+        found = matches[0] if len(matches) > 0 else None
+    else:
+        found = None
+        for frame_region, stack_image in frames:
+            text_found = text_find(target, frame_region, stack_image)
+            if len(text_found) > 0:
+                found = text_found[0]
+                break
+
+    if isinstance(condition, Vanish):
+        return True if found is None else None
+    return found
+
+
+def image_find_in_screenshot(pattern: Pattern, stack_image: ScreenshotImage, region: Rectangle):
+    """Search for an image in an already captured screenshot.
+
+    :param Pattern pattern: Name of the searched image.
+    :param ScreenshotImage stack_image: Screenshot of the region.
+    :param Region region: Region the screenshot was taken from.
+    :return: Match object, or None.
+    """
+    if not _is_pattern_size_correct(pattern, region):
+        return None
+    matches = _get_backend(pattern)(pattern, stack_image, region)
+    return matches[0] if len(matches) > 0 else None
+
+
+def image_classify(cells: list, patterns: list) -> list:
+    """Classify screen cells against candidate Patterns, with a single screenshot.
+
+    The screenshot covers the bounding box of all the cells and each candidate is correlated once over it. The score
+    of a candidate in a cell is the best value of that map among the positions where the candidate fits in the cell.
+
+    :param cells: List of Rectangle or Region objects, or list of lists of them as returned by Region.get_matrix.
+    :param patterns: List of Pattern objects.
+    :return: Table with the shape of cells, holding for each cell the (Pattern, Match) pair of the best candidate
+    reaching its similarity, or None.
+    """
+    is_matrix = len(cells) > 0 and isinstance(cells[0], (list, tuple))
+    flat_cells = [cell for row in cells for cell in row] if is_matrix else list(cells)
+    results = [None] * len(flat_cells)
+
+    if len(flat_cells) > 0 and len(patterns) > 0:
+        x_0 = int(min(cell.x for cell in flat_cells))
+        y_0 = int(min(cell.y for cell in flat_cells))
+        x_1 = int(max(cell.x + cell.width for cell in flat_cells))
+        y_1 = int(max(cell.y + cell.height for cell in flat_cells))
+        search_start = time.time()
+        frames = _get_screenshots(Rectangle(x_0, y_0, x_1 - x_0, y_1 - y_0), patterns)
+        if frames is not None:
+            for frame_region, stack_image in frames:
+                _classify_frame(flat_cells, patterns, frame_region, stack_image, results)
+        search_time = time.time() - search_start
+        for result in results:
+            if result is not None:
+                result[1].search_time = search_time
+
+    if not is_matrix:
+        return results
+    table = []
+    start = 0
+    for row in cells:
+        table.append(results[start:start + len(row)])
+        start += len(row)
+    return table
+
+
+def _classify_frame(cells: list, patterns: list, frame_region: Rectangle, stack_image: ScreenshotImage,
+                    results: list):
+    """Updates results with the best candidate found in each cell of one screenshot.
+
+    :param cells: List of Rectangle or Region objects.
+    :param patterns: List of Pattern objects.
+    :param frame_region: Rectangle the screenshot was taken from.
+    :param ScreenshotImage stack_image: Screenshot of frame_region.
+    :param results: List of (Pattern, Match) pairs or None, one per cell, updated in place.
+    :return: None.
+    """
+    cell_areas = []
+    for index, cell in enumerate(cells):
+        area = _get_intersection(Rectangle(int(cell.x), int(cell.y), int(cell.width), int(cell.height)), frame_region)
+        if area is not None:
+            cell_areas.append((index, area.x - frame_region.x, area.y - frame_region.y, area.width, area.height))
+
+    for pattern in patterns:
+        precision = pattern.similarity
+        if precision == 0.99:
+            stack_array, pattern_array = stack_image.get_color_array(), pattern.get_color_array()
+        else:
+            stack_array, pattern_array = stack_image.get_gray_array(), pattern.get_gray_array()
+        p_height, p_width = pattern_array.shape[:2]
+        if stack_array.shape[0] < p_height or stack_array.shape[1] < p_width:
+            continue
+
+        res = _get_correlation_map(stack_array, pattern_array)
+        for index, x, y, width, height in cell_areas:
+            if width < p_width or height < p_height:
+                continue
+            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res[y:y + height - p_height + 1,
+                                                                   x:x + width - p_width + 1])
+            if max_val >= precision and (results[index] is None or max_val > results[index][1].score):
+                match = Match(max_loc[0] + x + frame_region.x, max_loc[1] + y + frame_region.y, p_width, p_height,
+                              float(max_val), stack_image.frame_id)
+                results[index] = pattern, match
+    logger.debug('Classified %s cell(s) against %s candidate(s)' % (len(cell_areas), len(patterns)))
+
+
+def image_find_related(anchor, target, relation: Relation, region: Rectangle = None, distance: int = None):
+    """Search for a Pattern or text in the zone defined by another Pattern or text, in a single screenshot.
+
+    The anchor is searched first, then the target only in the part of the same screenshot implied by the relation.
+
+    :param anchor: Pattern or String searched first.
+    :param target: Pattern or String searched relative to the anchor.
+    :param Relation relation: Where the target is, relative to the anchor.
+    :param Region region: Region object.
+    :param distance: Maximum distance between the anchor and the target in pixels. None stands for the edge of the
+    region, or NEAR_DISTANCE for Relation.NEAR.
+    :return: Pair of the anchor and target results (Match for a Pattern, Rectangle for a String), or None.
+    """
+    frames = _get_screenshots(region, [anchor, target])
+    if frames is None:
+        return None
+
+    for frame_region, stack_image in frames:
+        anchor_found = _find_in_frame(anchor, stack_image, frame_region, frame_region)
+        if anchor_found is None:
+            continue
+        zone = _get_relation_zone(anchor_found, target, relation, frame_region, distance)
+        if zone is None:
+            continue
+        logger.debug('Searching %s %s %s in %s' % (target, relation.value, anchor, zone))
+        target_found = _find_in_frame(target, stack_image, frame_region, zone)
+        if target_found is not None:
+            return anchor_found, target_found
+    return None
+
+
+def _find_in_frame(ps, stack_image: ScreenshotImage, frame_region: Rectangle, area: Rectangle):
+    """Searches a Pattern or text in an area of an already captured screenshot.
+
+    :param ps: Pattern or String.
+    :param ScreenshotImage stack_image: Screenshot of frame_region.
+    :param frame_region: Rectangle the screenshot was taken from.
+    :param area: Rectangle to search, in screen coordinates, inside frame_region.
+    :return: Match for a Pattern, Rectangle for a String, in screen coordinates, or None.
+    """
+    sub_image = stack_image.crop(Rectangle(area.x - frame_region.x, area.y - frame_region.y, area.width,
+                                           area.height))
+    if isinstance(ps, Pattern):
+        found = _get_backend(ps)(ps, sub_image, area)
+    else:
+        found = text_find(ps, area, sub_image)
+    return found[0] if len(found) > 0 else None
+
+
+def _get_relation_zone(anchor_area: Rectangle, target, relation: Relation, frame_region: Rectangle,
+                       distance: int = None) -> Rectangle or None:
+    """Returns the screen area where a target can be, relative to the area where the anchor was found.
+
+    Targets to the right of or below the anchor must overlap it vertically or horizontally, so the zone is grown by
+    the target size across the relation. Text targets are assumed to be the size of the anchor.
+
+    :return: Rectangle clipped to frame_region, or None if it is empty.
+    """
+    if isinstance(target, Pattern):
+        t_width, t_height = target.get_size()
+    else:
+        t_width, t_height = anchor_area.width, anchor_area.height
+    a_right = anchor_area.x + anchor_area.width
+    a_bottom = anchor_area.y + anchor_area.height
+    f_right = frame_region.x + frame_region.width
+    f_bottom = frame_region.y + frame_region.height
+
+    if relation is Relation.RIGHT_OF:
+        x_0, x_1 = a_right, f_right if distance is None else a_right + distance + t_width
+        y_0, y_1 = anchor_area.y - t_height, a_bottom + t_height
+    elif relation is Relation.BELOW:
+        x_0, x_1 = anchor_area.x - t_width, a_right + t_width
+        y_0, y_1 = a_bottom, f_bottom if distance is None else a_bottom + distance + t_height
+    elif relation is Relation.NEAR:
+        if distance is None:
+            distance = NEAR_DISTANCE
+        x_0, x_1 = anchor_area.x - distance, a_right + distance
+        y_0, y_1 = anchor_area.y - distance, a_bottom + distance
+    else:
+        x_0, x_1 = anchor_area.x, a_right
+        y_0, y_1 = anchor_area.y, a_bottom
+
+    zone = _get_intersection(Rectangle(x_0, y_0, x_1 - x_0, y_1 - y_0), frame_region)
+    if zone is None or zone.width <= 0 or zone.height <= 0:
+        return None
+    return zone
+
+
+register_backend('template', _match_template_in_image)
+register_backend('orb', feature_match_in_image)
+register_backend('auto', _auto_match_in_image)
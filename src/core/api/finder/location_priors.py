@@ -0,0 +1,107 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import atexit
+import json
+import logging
+import os
+import threading
+
+from src.core.api.location import Location
+from src.core.api.os_helpers import OSHelper
+from src.core.api.screen.display import DisplayCollection
+from src.core.util.arg_parser import get_core_args
+from src.core.util.path_manager import PathManager
+
+logger = logging.getLogger(__name__)
+
+MAX_PRIORS_PER_PATTERN = 5
+
+_priors = None
+_is_dirty = False
+_lock = threading.Lock()
+
+
+def get_prior_locations(pattern, count: int = MAX_PRIORS_PER_PATTERN) -> list:
+    """Returns the locations where a pattern was found in previous runs, most frequent first.
+
+    :param pattern: Pattern object.
+    :param count: Maximum number of locations.
+    :return: List of Location objects in screen coordinates.
+    """
+    with _lock:
+        entries = _load_priors().get(_get_key(pattern), [])
+        return [Location(entry['x'], entry['y']) for entry in entries[:count]]
+
+
+def record_location(pattern, location: Location):
+    """Records that a pattern was found at the given location.
+
+    :param pattern: Pattern object.
+    :param location: Location object in screen coordinates.
+    :return: None.
+    """
+    global _is_dirty
+    x, y = int(location.x), int(location.y)
+    with _lock:
+        entries = _load_priors().setdefault(_get_key(pattern), [])
+        for entry in entries:
+            if entry['x'] == x and entry['y'] == y:
+                entry['hits'] += 1
+                break
+        else:
+            entries.append({'x': x, 'y': y, 'hits': 1})
+        entries.sort(key=lambda item: item['hits'], reverse=True)
+        del entries[MAX_PRIORS_PER_PATTERN:]
+        _is_dirty = True
+
+
+def save_prior_locations():
+    """Writes the recorded locations to the working directory, if anything changed since they were loaded."""
+    global _is_dirty
+    with _lock:
+        if not _is_dirty:
+            return
+        try:
+            with open(_get_priors_file(), 'w') as f:
+                json.dump(_priors, f, sort_keys=True, indent=True)
+            _is_dirty = False
+        except (IOError, OSError) as e:
+            logger.warning('Unable to save pattern locations: %s' % e)
+
+
+def _load_priors() -> dict:
+    """Loads the recorded locations once per process. Callers must hold the lock."""
+    global _priors
+    if _priors is None:
+        _priors = {}
+        priors_file = _get_priors_file()
+        if os.path.exists(priors_file):
+            try:
+                with open(priors_file, 'r') as f:
+                    _priors = json.load(f)
+                logger.debug('Loaded pattern locations for %s pattern(s) from %s' % (len(_priors), priors_file))
+            except (IOError, OSError, ValueError) as e:
+                logger.warning('Unable to load pattern locations: %s' % e)
+    return _priors
+
+
+def _get_priors_file() -> str:
+    return os.path.join(PathManager.get_working_dir(), 'data', 'pattern_locations.json')
+
+
+def _get_key(pattern) -> str:
+    """Entries are only valid for the same image on the same platform, locale and display layout."""
+    return '%s|%s|%s|%s' % (pattern.get_file_path(), OSHelper.get_os().value, get_core_args().locale,
+                            _display_geometry)
+
+
+def _get_display_geometry() -> str:
+    return ';'.join('%s,%s,%sx%s' % (display.bounds.x, display.bounds.y, display.bounds.width, display.bounds.height)
+                    for display in DisplayCollection)
+
+
+_display_geometry = _get_display_geometry()
+atexit.register(save_prior_locations)
@@ -0,0 +1,58 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+from src.core.api.enums import Alignment
+from src.core.api.location import Location
+from src.core.api.rectangle import Rectangle
+
+
+class Match(Location):
+    """A Match is the Location where a Pattern was found, along with the details of the search that found it.
+
+    It can be used anywhere a Location is expected: x and y are the top left corner of the match. The size is the one
+    of the pattern at the scale it was found, the score is the correlation value computed by the search, the frame id
+    identifies the screenshot that was searched and the search time is the number of seconds that search took.
+    """
+
+    def __init__(self, x: int = 0, y: int = 0, width: int = 0, height: int = 0, score: float = None,
+                 frame_id: int = None, search_time: float = None):
+        Location.__init__(self, x, y)
+        self.width = width
+        self.height = height
+        self.score = score
+        self.frame_id = frame_id
+        self.search_time = search_time
+
+    def __repr__(self):
+        return '%s(%r, %r, %r, %r, %r)' % (self.__class__.__name__, self.x, self.y, self.width, self.height,
+                                           self.score)
+
+    def get_location(self) -> Location:
+        """Returns the top left corner of the match as a plain Location."""
+        return Location(self.x, self.y)
+
+    def get_size(self) -> (int, int):
+        """Getter for the width and height of the match."""
+        return self.width, self.height
+
+    def get_score(self) -> float:
+        """Getter for the score property."""
+        return self.score
+
+    def get_frame_id(self) -> int:
+        """Getter for the frame_id property."""
+        return self.frame_id
+
+    def get_search_time(self) -> float:
+        """Getter for the search_time property."""
+        return self.search_time
+
+    def get_rectangle(self) -> Rectangle:
+        """Returns the screen area covered by the match."""
+        return Rectangle(self.x, self.y, self.width, self.height)
+
+    def get_target(self, align: Alignment = Alignment.CENTER) -> Location:
+        """Returns the location of the match for the given alignment, its center by default."""
+        return self.get_rectangle().apply_alignment(align)
@@ -47,12 +47,18 @@ class Pattern:
         self.image_path = path
         self.scale_factor = scale
         self.similarity = Settings.min_similarity
+        self.pyramid_search = None
+        self.multi_scale_search = None
+        self.sub_patch_search = None
+        self.search_backend = None
         self._target_offset = None
+        self._scaled_arrays = {}
         self._size = _get_pattern_size(image, scale)
         self.rgb_array = _get_array_from_image(image)
         self.color_image = _get_image_from_array(scale, self.rgb_array)
         self.gray_image = _get_gray_image(self.color_image)
         self.gray_array = _get_array_from_image(self.gray_image)
+        self._color_array = None
 
     def __str__(self):
         return '(%s, %s, %s, %s)' % (self.image_name, self.image_path, self.scale_factor, self.similarity)
@@ -119,13 +125,57 @@ class Pattern:
         self.similarity = 0.99
         return self
 
+    def pyramid(self, value: bool = True):
+        """Enable or disable the coarse-to-fine pyramid search for this Pattern, overriding Settings.pyramid_search."""
+        self.pyramid_search = value
+        return self
+
+    def multi_scale(self, value: bool = True):
+        """Enable or disable the multi-scale search for this Pattern, overriding Settings.multi_scale_search."""
+        self.multi_scale_search = value
+        return self
+
+    def sub_patch(self, value: bool = True):
+        """Enable or disable the search by a distinctive sub-patch for this Pattern, overriding
+        Settings.sub_patch_search."""
+        self.sub_patch_search = value
+        return self
+
+    def backend(self, name: str):
+        """Set the matching engine used to search this Pattern, overriding Settings.search_backend. Available
+        engines are 'template', 'orb' and 'auto', see image_search.register_backend."""
+        self.search_backend = name
+        return self
+
     def get_size(self):
         """Getter for the _size property."""
         return self._size
 
     def get_color_array(self):
-        """Encode color image to BGR2RGB """
-        return cv2.cvtColor(np.array(self.color_image), cv2.COLOR_BGR2RGB)
+        """Encode color image to BGR2RGB. The converted array is computed once and cached."""
+        if self._color_array is None:
+            self._color_array = cv2.cvtColor(np.array(self.color_image), cv2.COLOR_BGR2RGB)
+        return self._color_array
+
+    def get_scaled_gray_array(self, scale: float):
+        """Getter for the gray array resized by the given factor. Resized arrays are cached."""
+        return self._get_scaled_array(scale, False)
+
+    def get_scaled_color_array(self, scale: float):
+        """Getter for the color array resized by the given factor. Resized arrays are cached."""
+        return self._get_scaled_array(scale, True)
+
+    def _get_scaled_array(self, scale: float, is_color: bool):
+        array = self.get_color_array() if is_color else self.get_gray_array()
+        if scale == 1:
+            return array
+        key = (scale, is_color)
+        if key not in self._scaled_arrays:
+            height, width = array.shape[:2]
+            new_size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            self._scaled_arrays[key] = cv2.resize(array, new_size, interpolation=interpolation)
+        return self._scaled_arrays[key]
 
 
 def _parse_name(full_name: str) -> (str, int):
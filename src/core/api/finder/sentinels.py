@@ -0,0 +1,56 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import logging
+import threading
+
+from src.core.api.enums import SentinelScope
+from src.core.api.finder.pattern import Pattern
+
+logger = logging.getLogger(__name__)
+
+_sentinels = []
+_lock = threading.Lock()
+
+
+def add_sentinel(pattern: Pattern, scope: SentinelScope = SentinelScope.TEST, message: str = None):
+    """Register a pattern that must never appear during a wait, such as a crash dialog or an error page.
+
+    Sentinels are searched in the same screenshot as the waited patterns, on every polling tick. As soon as one is
+    found, the wait raises SentinelError instead of running until its timeout.
+
+    :param pattern: Pattern object.
+    :param scope: SentinelScope, the sentinel is removed at the end of the current test, target or never.
+    :param message: Description added to the error, by default the pattern file name.
+    :return: None.
+    """
+    if not isinstance(scope, SentinelScope):
+        raise ValueError('%s should be an instance of `%s`' % (scope, SentinelScope))
+    with _lock:
+        _sentinels[:] = [entry for entry in _sentinels if entry[0].get_file_path() != pattern.get_file_path()]
+        _sentinels.append((pattern, scope, message))
+    logger.debug('Added %s sentinel %s' % (scope.value, pattern.get_filename()))
+
+
+def remove_sentinel(pattern: Pattern):
+    """Remove a sentinel pattern, whatever its scope."""
+    with _lock:
+        _sentinels[:] = [entry for entry in _sentinels if entry[0].get_file_path() != pattern.get_file_path()]
+
+
+def clear_sentinels(scope: SentinelScope = None):
+    """Remove the sentinels of a scope, or all of them.
+
+    :param scope: SentinelScope, or None for every scope.
+    :return: None.
+    """
+    with _lock:
+        _sentinels[:] = [entry for entry in _sentinels if scope is not None and entry[1] is not scope]
+
+
+def get_sentinels() -> list:
+    """Returns the registered sentinels as (Pattern, message) pairs, in registration order."""
+    with _lock:
+        return [(pattern, message) for pattern, scope, message in _sentinels]
@@ -109,13 +109,13 @@ def _get_first_word(word, data_list):
     return words_found
 
 
-def _text_search(text, region: Rectangle = None, multiple_search=False):
-    """Search text in region or screen."""
+def _text_search(text, region: Rectangle = None, multiple_search=False, stack_image: ScreenshotImage = None):
+    """Search text in region or screen, or in an already captured screenshot of the region."""
     if region is None:
         region = DisplayCollection[0].bounds
 
     logger.debug('Text find: \'{}\''.format(text))
-    img = ScreenshotImage(region=region)
+    img = ScreenshotImage(region=region) if stack_image is None else stack_image
     raw_gray_image = img.get_gray_image()
     enhanced_image = ImageEnhance.Contrast(img.get_gray_image()).enhance(10.0)
     data_list = _get_processed_data([raw_gray_image, enhanced_image])
@@ -176,9 +176,9 @@ def _text_search(text, region: Rectangle = None, multiple_search=False):
     return final_result
 
 
-def text_find(text, region):
-    return _text_search(text, region, False)
+def text_find(text, region, stack_image: ScreenshotImage = None):
+    return _text_search(text, region, False, stack_image)
 
 
-def text_find_all(text, region):
-    return _text_search(text, region, True)
+def text_find_all(text, region, stack_image: ScreenshotImage = None):
+    return _text_search(text, region, True, stack_image)
@@ -254,12 +254,13 @@ def _get_pattern_click_location(ps: Pattern, region: Rectangle = None, align: Al
     if align is None:
         align = Alignment.CENTER
 
-    width, height = ps.get_size()
     find_location = image_find(ps, region=region)
 
     if find_location is None:
         raise FindError('Unable to find pattern {}'.format(ps.get_filename()))
 
+    width, height = find_location.get_size()
+
     if ps.get_target_offset():
         target_offset = ps.get_target_offset()
         find_location.x += target_offset.x
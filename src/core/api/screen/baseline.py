@@ -0,0 +1,231 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+import cv2
+import numpy as np
+
+from src.core.api.finder.image_search import capture_region
+from src.core.api.os_helpers import OSHelper
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen.display import DisplayCollection
+from src.core.api.settings import Settings
+from src.core.util.arg_parser import get_core_args
+from src.core.util.path_manager import PathManager
+
+logger = logging.getLogger(__name__)
+
+SSIM_TILE_SIZE = 32
+SSIM_WINDOW_SIZE = 7
+SSIM_SIGMA = 1.5
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+_lock = threading.Lock()
+
+
+class BaselineComparison:
+    """Result of the comparison of a screen capture with a stored baseline.
+
+    It is truthy when the capture matches the baseline, so it can be asserted directly.
+    """
+
+    def __init__(self, name: str, score: float, differences: list, diff_image_path: str = None,
+                 is_new: bool = False):
+        self.name = name
+        self.score = score
+        self.differences = differences
+        self.diff_image_path = diff_image_path
+        self.is_new = is_new
+
+    def __repr__(self):
+        return '%s(%r, %r, %r)' % (self.__class__.__name__, self.name, self.score, self.differences)
+
+    def __bool__(self):
+        return self.is_match()
+
+    def is_match(self) -> bool:
+        """Returns True if no tile of the capture differs from the baseline."""
+        return len(self.differences) == 0
+
+
+def compare_to_baseline(name: str, region: Rectangle = None, similarity: float = None,
+                        update: bool = False) -> BaselineComparison:
+    """Compare a capture of a region or screen with the baseline stored under a name.
+
+    The structural similarity (SSIM) of the two gray images is averaged over tiles of SSIM_TILE_SIZE pixels, and the
+    tiles scoring below the similarity threshold are merged into the differing rectangles. A diff image is written to
+    the debug image directory only when they differ. When there is no baseline yet for this name, platform and
+    locale, or when update is True, the capture is stored as the baseline.
+
+    :param name: Baseline name.
+    :param region: Rectangle object, by default the primary display.
+    :param similarity: Minimum similarity of every tile, by default Settings.baseline_similarity.
+    :param update: Replace the stored baseline by the current capture.
+    :return: BaselineComparison object.
+    """
+    if region is None:
+        region = DisplayCollection[0].bounds
+    if similarity is None:
+        similarity = Settings.baseline_similarity
+
+    capture = capture_region(region).get_color_array()
+    baseline = None if update else _load_baseline(name)
+    if baseline is None:
+        _store_baseline(name, capture)
+        logger.info('Stored baseline %s' % name)
+        return BaselineComparison(name, 1.0, [], is_new=True)
+
+    if baseline.shape != capture.shape:
+        logger.warning('Baseline %s size %s differs from the capture size %s' % (name, baseline.shape[:2],
+                                                                                capture.shape[:2]))
+        differences = [Rectangle(region.x, region.y, region.width, region.height)]
+        return BaselineComparison(name, 0.0, differences, _save_diff_image(name, baseline, capture, []))
+
+    tile_scores = _get_tile_similarity(cv2.cvtColor(np.asarray(baseline), cv2.COLOR_RGB2GRAY),
+                                       cv2.cvtColor(capture, cv2.COLOR_RGB2GRAY))
+    score = float(tile_scores.min())
+    differences = _get_differing_areas(tile_scores < similarity, capture.shape[:2])
+    diff_image_path = None
+    if len(differences) > 0:
+        diff_image_path = _save_diff_image(name, baseline, capture, differences)
+    logger.debug('Baseline %s: lowest tile similarity %s, %s differing area(s)' % (name, score, len(differences)))
+
+    for area in differences:
+        area.x += region.x
+        area.y += region.y
+    return BaselineComparison(name, score, differences, diff_image_path)
+
+
+def _get_tile_similarity(first, second):
+    """Returns the mean structural similarity of two gray images over each tile of SSIM_TILE_SIZE pixels."""
+    first = first.astype(np.float32)
+    second = second.astype(np.float32)
+    window = (SSIM_WINDOW_SIZE, SSIM_WINDOW_SIZE)
+
+    mu_1 = cv2.GaussianBlur(first, window, SSIM_SIGMA)
+    mu_2 = cv2.GaussianBlur(second, window, SSIM_SIGMA)
+    mu_1_mu_2 = mu_1 * mu_2
+    mu_1_square = mu_1 * mu_1
+    mu_2_square = mu_2 * mu_2
+    sigma_1_square = cv2.GaussianBlur(first * first, window, SSIM_SIGMA) - mu_1_square
+    sigma_2_square = cv2.GaussianBlur(second * second, window, SSIM_SIGMA) - mu_2_square
+    sigma_1_2 = cv2.GaussianBlur(first * second, window, SSIM_SIGMA) - mu_1_mu_2
+    ssim_map = ((2 * mu_1_mu_2 + SSIM_C1) * (2 * sigma_1_2 + SSIM_C2)) / \
+               ((mu_1_square + mu_2_square + SSIM_C1) * (sigma_1_square + sigma_2_square + SSIM_C2))
+
+    height, width = ssim_map.shape
+    rows = np.arange(0, height, SSIM_TILE_SIZE)
+    cols = np.arange(0, width, SSIM_TILE_SIZE)
+    sums = np.add.reduceat(np.add.reduceat(ssim_map.astype(np.float64), rows, axis=0), cols, axis=1)
+    counts = np.diff(np.append(rows, height))[:, None] * np.diff(np.append(cols, width))[None, :]
+    return sums / counts
+
+
+def _get_differing_areas(tile_mask, shape: (int, int)) -> list:
+    """Merges the differing tiles that touch each other into rectangles, in image coordinates."""
+    height, width = shape
+    count, labels, stats, centroids = cv2.connectedComponentsWithStats(tile_mask.astype(np.uint8), connectivity=8)
+    areas = []
+    for x, y, tiles_width, tiles_height, area in stats[1:]:
+        x_0, y_0 = x * SSIM_TILE_SIZE, y * SSIM_TILE_SIZE
+        x_1 = min(width, (x + tiles_width) * SSIM_TILE_SIZE)
+        y_1 = min(height, (y + tiles_height) * SSIM_TILE_SIZE)
+        areas.append(Rectangle(int(x_0), int(y_0), int(x_1 - x_0), int(y_1 - y_0)))
+    return areas
+
+
+def _save_diff_image(name: str, baseline, capture, differences: list) -> str:
+    """Writes the baseline and the capture side by side, with the differing areas outlined on both. Both arrays are
+    RGB on every platform, as returned by ScreenshotImage.get_color_array.
+
+    :return: Path of the diff image.
+    """
+    height, width = capture.shape[:2]
+    b_height, b_width = baseline.shape[:2]
+    diff_array = np.zeros((max(height, b_height), width + b_width, 3), dtype=np.uint8)
+    diff_array[:b_height, :b_width] = baseline
+    diff_array[:height, b_width:] = capture
+    diff_array = cv2.cvtColor(diff_array, cv2.COLOR_RGB2BGR)
+    for area in differences:
+        for offset in (0, b_width):
+            cv2.rectangle(diff_array, (area.x + offset, area.y),
+                          (area.x + offset + area.width, area.y + area.height), (0, 0, 255), 2)
+
+    path = PathManager.get_debug_image_directory()
+    if not os.path.exists(path):
+        os.makedirs(path)
+    timestamp_str = re.sub('[ :.-]', '_', str(datetime.datetime.now()))
+    file_name = os.path.join(path, '%s_%s_baseline_diff.png' % (timestamp_str, re.sub(r'\W', '_', name)))
+    cv2.imwrite(file_name, diff_array)
+    logger.info('Baseline %s differs, see %s' % (name, file_name))
+    return file_name
+
+
+def _load_baseline(name: str):
+    """Returns the stored baseline array for a name, memory-mapped read-only, or None."""
+    with _lock:
+        digest = _load_index().get(_get_key(name))
+    if digest is None:
+        return None
+    try:
+        return np.load(_get_object_path(digest), mmap_mode='r')
+    except (IOError, OSError, ValueError) as e:
+        logger.warning('Unable to load baseline %s: %s' % (name, e))
+        return None
+
+
+def _store_baseline(name: str, array):
+    """Stores an array once under its content digest, and points the name to it."""
+    array = np.ascontiguousarray(array)
+    digest = hashlib.sha1(('%s|%s|' % (array.shape, array.dtype)).encode() + array.tobytes()).hexdigest()
+    object_path = _get_object_path(digest)
+    with _lock:
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            temp_path = '%s.tmp.npy' % object_path[:-len('.npy')]
+            np.save(temp_path, array)
+            os.replace(temp_path, object_path)
+        index = _load_index()
+        index[_get_key(name)] = digest
+        with open(_get_index_path(), 'w') as f:
+            json.dump(index, f, sort_keys=True, indent=True)
+
+
+def _load_index() -> dict:
+    """Loads the index of baseline names. Callers must hold the lock."""
+    index_path = _get_index_path()
+    if not os.path.exists(index_path):
+        return {}
+    try:
+        with open(index_path, 'r') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        logger.warning('Unable to load baseline index: %s' % e)
+        return {}
+
+
+def _get_baseline_dir() -> str:
+    return os.path.join(PathManager.get_working_dir(), 'baselines')
+
+
+def _get_index_path() -> str:
+    return os.path.join(_get_baseline_dir(), 'index.json')
+
+
+def _get_object_path(digest: str) -> str:
+    return os.path.join(_get_baseline_dir(), 'objects', digest[:2], '%s.npy' % digest)
+
+
+def _get_key(name: str) -> str:
+    """Baselines are recorded per platform and locale, identical images share the same stored object."""
+    return '%s|%s|%s' % (name, OSHelper.get_os().value, get_core_args().locale)
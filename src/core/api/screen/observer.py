@@ -0,0 +1,193 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import logging
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from src.core.api.enums import ObserveEventType
+from src.core.api.errors import ScreenshotError
+from src.core.api.finder.image_search import capture_region, image_find_in_screenshot
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen.screenshot_image import ScreenshotImage
+from src.core.api.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_observers = []
+_lock = threading.Lock()
+
+
+class ObserveEvent:
+    """Event passed to the callbacks of an Observer."""
+
+    def __init__(self, event_type: ObserveEventType, region: Rectangle, frame_id: int, pattern=None, match=None,
+                 changed_pixels: int = 0, changes: list = None):
+        self.type = event_type
+        self.region = region
+        self.frame_id = frame_id
+        self.pattern = pattern
+        self.match = match
+        self.changed_pixels = changed_pixels
+        self.changes = changes or []
+
+    def __repr__(self):
+        return '%s(%r, %r, %r, %r)' % (self.__class__.__name__, self.type, self.pattern, self.match,
+                                       self.changed_pixels)
+
+
+class Observer:
+    """Watches a region on a background thread and calls back when Patterns appear or vanish, or when it changes.
+
+    The region is captured Settings.observe_scan_rate times per second. Each capture is compared with the previous
+    one with a single vectorized difference, and the Patterns are only searched again when some pixels changed.
+    Callbacks run on the observer thread, an exception raised by a callback is logged and does not stop it.
+    """
+
+    def __init__(self, region: Rectangle, on_appear=None, on_vanish=None, on_change=None, timeout: float = None,
+                 scan_rate: float = None, min_changed_pixels: int = None):
+        """
+        :param region: Rectangle object observed.
+        :param on_appear: Dict or list of (Pattern, callback) pairs, called when the Pattern becomes visible.
+        :param on_vanish: Dict or list of (Pattern, callback) pairs, called when the Pattern stops being visible.
+        :param on_change: Callback called when at least min_changed_pixels pixels changed between two captures.
+        :param timeout: Number of seconds after which the observer stops, None to run until stop() is called.
+        :param scan_rate: Number of captures per second, by default Settings.observe_scan_rate.
+        :param min_changed_pixels: Minimum number of changed pixels of a change event, by default
+        Settings.observe_min_changed_pixels.
+        """
+        self.region = region
+        self.on_appear = _get_callback_pairs(on_appear)
+        self.on_vanish = _get_callback_pairs(on_vanish)
+        self.on_change = on_change
+        self.timeout = timeout
+        self.scan_rate = Settings.observe_scan_rate if scan_rate is None else scan_rate
+        self.min_changed_pixels = Settings.observe_min_changed_pixels if min_changed_pixels is None \
+            else min_changed_pixels
+        self._patterns = []
+        for pattern, callback in self.on_appear + self.on_vanish:
+            if pattern not in self._patterns:
+                self._patterns.append(pattern)
+        self._visible = {}
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='iris_observer', daemon=True)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.region)
+
+    def start(self):
+        """Start observing, returns immediately."""
+        with _lock:
+            _observers.append(self)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """Stop observing and wait for the observer thread to end.
+
+        :param timeout: Maximum number of seconds to wait for the thread, None to wait until it ends.
+        :return: None.
+        """
+        self._stop_event.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        with _lock:
+            if self in _observers:
+                _observers.remove(self)
+
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def _run(self):
+        end_time = None if self.timeout is None else time.time() + self.timeout
+        previous_array = None
+        while not self._stop_event.is_set() and (end_time is None or time.time() < end_time):
+            scan_start = time.time()
+            try:
+                stack_image = capture_region(self.region)
+            except ScreenshotError:
+                logger.warning('Observer screenshot failed.')
+                stack_image = None
+
+            if stack_image is not None:
+                gray_array = stack_image.get_gray_array()
+                if previous_array is None or previous_array.shape != gray_array.shape:
+                    self._search_patterns(stack_image)
+                else:
+                    change_mask = cv2.absdiff(previous_array, gray_array)
+                    changed_pixels = cv2.countNonZero(change_mask)
+                    if changed_pixels > 0:
+                        if self.on_change is not None and changed_pixels >= self.min_changed_pixels:
+                            self._dispatch(self.on_change, ObserveEvent(
+                                ObserveEventType.CHANGE, self.region, stack_image.frame_id,
+                                changed_pixels=changed_pixels, changes=self._get_changed_areas(change_mask)))
+                        self._search_patterns(stack_image)
+                previous_array = gray_array
+
+            if self.scan_rate and self.scan_rate > 0:
+                self._stop_event.wait(max(0.0, scan_start + 1 / self.scan_rate - time.time()))
+        with _lock:
+            if self in _observers:
+                _observers.remove(self)
+
+    def _search_patterns(self, stack_image: ScreenshotImage):
+        for pattern in self._patterns:
+            match = image_find_in_screenshot(pattern, stack_image, self.region)
+            was_visible = self._visible.get(id(pattern), False)
+            self._visible[id(pattern)] = match is not None
+            if match is not None and not was_visible:
+                for callback in [callback for p, callback in self.on_appear if p is pattern]:
+                    self._dispatch(callback, ObserveEvent(ObserveEventType.APPEAR, self.region, stack_image.frame_id,
+                                                          pattern, match))
+            elif match is None and was_visible:
+                for callback in [callback for p, callback in self.on_vanish if p is pattern]:
+                    self._dispatch(callback, ObserveEvent(ObserveEventType.VANISH, self.region, stack_image.frame_id,
+                                                          pattern))
+
+    def _get_changed_areas(self, change_mask) -> list:
+        """Returns the bounding rectangles of the connected changed areas, in screen coordinates."""
+        count, labels, stats, centroids = cv2.connectedComponentsWithStats(np.uint8(change_mask > 0), connectivity=8)
+        return [Rectangle(int(x + self.region.x), int(y + self.region.y), int(width), int(height))
+                for x, y, width, height, area in stats[1:]]
+
+    @staticmethod
+    def _dispatch(callback, event: ObserveEvent):
+        try:
+            callback(event)
+        except Exception:
+            logger.exception('Observer callback failed for %s' % event)
+
+
+def _get_callback_pairs(callbacks) -> list:
+    """Returns (Pattern, callback) pairs as a list, keeping every callback registered for the same Pattern."""
+    if callbacks is None:
+        return []
+    if isinstance(callbacks, dict):
+        return list(callbacks.items())
+    return list(callbacks)
+
+
+def observe(region: Rectangle, on_appear=None, on_vanish=None, on_change=None, timeout: float = None) -> Observer:
+    """Start observing a region in the background.
+
+    :param region: Rectangle object.
+    :param on_appear: Dict or list of (Pattern, callback) pairs, called when the Pattern becomes visible.
+    :param on_vanish: Dict or list of (Pattern, callback) pairs, called when the Pattern stops being visible.
+    :param on_change: Callback called when enough pixels of the region changed between two captures.
+    :param timeout: Number of seconds after which the observer stops, None to run until stopped.
+    :return: Started Observer object, each callback receives an ObserveEvent.
+    """
+    return Observer(region, on_appear, on_vanish, on_change, timeout).start()
+
+
+def stop_observers():
+    """Stop all the running observers."""
+    with _lock:
+        observers = list(_observers)
+    for observer in observers:
+        observer.stop()
@@ -4,10 +4,14 @@
 
 
 from src.core.api.errors import FindError
-from src.core.api.finder.finder import wait, find, find_all, exists, highlight, wait_vanish
+from src.core.api.finder.finder import wait, find, find_all, exists, highlight, wait_vanish, find_any, find_all_of, \
+    right_of, below, near, inside, classify, find_color, count_pixels, get_pixel, wait_any, wait_all
+from src.core.api.finder.match import Match
 from src.core.api.location import Location
 from src.core.api.mouse.mouse import move, press, release, click, right_click, double_click, drag_drop, hover
 from src.core.api.rectangle import Rectangle
+from src.core.api.screen.baseline import compare_to_baseline
+from src.core.api.screen.observer import observe
 
 
 class Region:
@@ -120,13 +124,148 @@ class Region:
         """
         return find(ps, self._area)
 
-    def find_all(self, ps=None):
+    def find_all(self, ps=None, max_results=None):
         """Look for multiple matches of a Pattern or image.
 
         :param ps: Pattern or String.
+        :param max_results: Maximum number of Pattern matches to return, best scores first.
         :return: Call the find_all() method.
         """
-        return find_all(ps, self._area)
+        return find_all(ps, self._area, max_results)
+
+    def find_any(self, patterns=None, timeout=None):
+        """Look for the first of several Patterns that appears.
+
+        :param patterns: List of Pattern objects.
+        :param timeout: Number as maximum waiting time in seconds.
+        :return: Call the find_any() method.
+        """
+        return find_any(patterns, timeout, self._area)
+
+    def find_all_of(self, patterns=None, timeout=None):
+        """Look for several Patterns that are all visible at the same time.
+
+        :param patterns: List of Pattern objects.
+        :param timeout: Number as maximum waiting time in seconds.
+        :return: Call the find_all_of() method.
+        """
+        return find_all_of(patterns, timeout, self._area)
+
+    def wait_any(self, conditions=None, timeout=None):
+        """Wait for the first of several conditions.
+
+        :param conditions: List of Pattern, String or Vanish objects.
+        :param timeout: Number as maximum waiting time in seconds.
+        :return: Call the wait_any() method.
+        """
+        return wait_any(conditions, timeout, self._area)
+
+    def wait_all(self, conditions=None, timeout=None):
+        """Wait until several conditions are all met.
+
+        :param conditions: List of Pattern, String or Vanish objects.
+        :param timeout: Number as maximum waiting time in seconds.
+        :return: Call the wait_all() method.
+        """
+        return wait_all(conditions, timeout, self._area)
+
+    def find_color(self, color=None, tolerance=0, min_pixels=1):
+        """Look for the areas of this Region that have a given color.
+
+        :param color: (red, green, blue) tuple.
+        :param tolerance: Maximum difference allowed on each color channel.
+        :param min_pixels: Minimum number of pixels of an area.
+        :return: Call the find_color() method.
+        """
+        return find_color(color, self._area, tolerance, min_pixels)
+
+    def count_pixels(self, predicate=None, tolerance=0):
+        """Count the pixels of this Region that have a given color or satisfy a predicate.
+
+        :param predicate: (red, green, blue) tuple, or function taking an RGB array and returning a boolean array.
+        :param tolerance: Maximum difference allowed on each color channel, when predicate is a color.
+        :return: Call the count_pixels() method.
+        """
+        return count_pixels(predicate, self._area, tolerance)
+
+    @staticmethod
+    def get_pixel(location=None):
+        """Get the color of the pixel at a screen location.
+
+        :param location: Location object.
+        :return: Call the get_pixel() method.
+        """
+        return get_pixel(location)
+
+    def observe(self, on_appear=None, on_vanish=None, on_change=None, timeout=None):
+        """Observe this Region in the background, calling back when Patterns appear or vanish or when it changes.
+
+        :param on_appear: Dict or list of (Pattern, callback) pairs.
+        :param on_vanish: Dict or list of (Pattern, callback) pairs.
+        :param on_change: Callback called when enough pixels of the Region changed.
+        :param timeout: Number of seconds after which the observer stops, None to run until stopped.
+        :return: Call the observe() method.
+        """
+        return observe(self._area, on_appear, on_vanish, on_change, timeout)
+
+    def compare_to_baseline(self, name=None, similarity=None, update=False):
+        """Compare this Region with the baseline stored under a name, storing it first if there is none.
+
+        :param name: Baseline name.
+        :param similarity: Minimum similarity of every tile of the Region.
+        :param update: Replace the stored baseline by the current capture.
+        :return: Call the compare_to_baseline() method.
+        """
+        return compare_to_baseline(name, self._area, similarity, update)
+
+    def classify(self, patterns=None, number_of_columns=1, number_of_lines=1):
+        """Find which of several Patterns each cell of this Region, divided as a matrix, shows.
+
+        :param patterns: List of Pattern objects.
+        :param number_of_columns: Number of matrix columns.
+        :param number_of_lines: Number of matrix lines.
+        :return: Call the classify() method.
+        """
+        return classify(Region.get_matrix(number_of_columns, number_of_lines, self._area), patterns)
+
+    def right_of(self, anchor=None, target=None, distance=None):
+        """Look for a Pattern or text to the right of another one in this Region.
+
+        :param anchor: Pattern or String.
+        :param target: Pattern or String.
+        :param distance: Maximum gap in pixels between the anchor and the target.
+        :return: Call the right_of() method.
+        """
+        return right_of(anchor, target, self._area, distance)
+
+    def below(self, anchor=None, target=None, distance=None):
+        """Look for a Pattern or text below another one in this Region.
+
+        :param anchor: Pattern or String.
+        :param target: Pattern or String.
+        :param distance: Maximum gap in pixels between the anchor and the target.
+        :return: Call the below() method.
+        """
+        return below(anchor, target, self._area, distance)
+
+    def near(self, anchor=None, target=None, distance=None):
+        """Look for a Pattern or text around another one in this Region.
+
+        :param anchor: Pattern or String.
+        :param target: Pattern or String.
+        :param distance: Number of pixels the anchor area is grown by on each side.
+        :return: Call the near() method.
+        """
+        return near(anchor, target, self._area, distance)
+
+    def inside(self, anchor=None, target=None):
+        """Look for a Pattern or text within the area of another one in this Region.
+
+        :param anchor: Pattern or String.
+        :param target: Pattern or String.
+        :return: Call the inside() method.
+        """
+        return inside(anchor, target, self._area)
 
     def hover(self, lps=None, align=None):
         """Mouse hover.
@@ -136,12 +275,12 @@ class Region:
         """
         return hover(lps, self._area, align)
 
-    def wait(self, ps=None, timeout=None) -> bool or FindError:
+    def wait(self, ps=None, timeout=None) -> Match or FindError:
         """Wait for a Pattern or image to appear.
 
         :param ps: Pattern or String.
         :param timeout: Number as maximum waiting time in seconds.
-        :return: True or FineError Exception.
+        :return: Match object or FindError Exception.
         """
         return wait(ps, timeout, self._area)
 
@@ -0,0 +1,128 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import logging
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from src.core.api.finder.image_search import capture_region, image_find_in_screenshot
+from src.core.api.finder.pattern import Pattern
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen.display import DisplayCollection
+from src.core.api.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+HASH_IMAGE_SIZE = 32
+HASH_BITS = HASH_SIZE * HASH_SIZE
+STATE_CONFIDENCE_MARGIN = 0.05
+
+_states = OrderedDict()
+_lock = threading.Lock()
+
+
+def register_state(name: str, reference: Pattern = None, region: Rectangle = None, patterns: list = None):
+    """Register a known screen state, identified by the perceptual hash of a reference image.
+
+    :param name: State name.
+    :param reference: Pattern object of a screenshot of the state, by default the current capture of the region.
+    :param region: Rectangle object hashed to identify the state, by default the primary display.
+    :param patterns: List of Pattern objects that are visible in this state, used to verify it when its hash alone is
+    not conclusive.
+    :return: None.
+    """
+    if region is None:
+        region = DisplayCollection[0].bounds
+
+    if reference is None:
+        gray_array = capture_region(region).get_gray_array()
+    else:
+        gray_array = reference.get_gray_array()
+
+    with _lock:
+        _states[name] = {'hash': _get_perceptual_hash(gray_array), 'region': region, 'patterns': patterns or []}
+    logger.debug('Registered screen state %s' % name)
+
+
+def remove_state(name: str):
+    """Forget a registered screen state."""
+    with _lock:
+        _states.pop(name, None)
+
+
+def identify_state(region: Rectangle = None, min_confidence: float = None):
+    """Identify the current screen state, from a single capture.
+
+    Each registered state is scored by the similarity of its hash with the hash of the same area of the capture,
+    computed once per distinct area. When the best score is below min_confidence, or another state scores within
+    STATE_CONFIDENCE_MARGIN of it, the candidates that have verification patterns are checked in order of score by
+    searching those patterns in the same capture.
+
+    :param region: Rectangle object captured, containing the regions of the states. By default the primary display.
+    :param min_confidence: Minimum hash similarity of a state, by default Settings.state_min_confidence.
+    :return: Pair of the state name and its confidence (hash similarity, or lowest pattern score when verified by
+    template), or None if no state matches.
+    """
+    if region is None:
+        region = DisplayCollection[0].bounds
+    if min_confidence is None:
+        min_confidence = Settings.state_min_confidence
+
+    with _lock:
+        states = list(_states.items())
+    if len(states) == 0:
+        return None
+
+    stack_image = capture_region(region)
+    area_hashes = {}
+    scores = []
+    for name, state in states:
+        area = state['region']
+        key = (area.x, area.y, area.width, area.height)
+        if key not in area_hashes:
+            sub_image = stack_image.crop(Rectangle(area.x - region.x, area.y - region.y, area.width, area.height))
+            gray_array = sub_image.get_gray_array()
+            area_hashes[key] = _get_perceptual_hash(gray_array) if gray_array.size > 0 else None
+        if area_hashes[key] is not None:
+            scores.append((_get_hash_similarity(state['hash'], area_hashes[key]), name, state))
+    scores.sort(key=lambda score: score[0], reverse=True)
+    if len(scores) == 0:
+        return None
+
+    best_confidence, best_name, best_state = scores[0]
+    is_ambiguous = len(scores) > 1 and scores[1][0] >= best_confidence - STATE_CONFIDENCE_MARGIN
+    logger.debug('Screen state scores: %s' % ', '.join('%s %.2f' % (name, score) for score, name, state in scores))
+    if best_confidence >= min_confidence and not is_ambiguous:
+        return best_name, best_confidence
+
+    for confidence, name, state in scores:
+        if len(state['patterns']) == 0:
+            continue
+        matches = [image_find_in_screenshot(pattern, stack_image, region) for pattern in state['patterns']]
+        if all(match is not None for match in matches):
+            logger.debug('Screen state %s verified by template' % name)
+            return name, min(match.score for match in matches)
+
+    if best_confidence >= min_confidence and len(best_state['patterns']) == 0:
+        return best_name, best_confidence
+    return None
+
+
+def _get_perceptual_hash(gray_array) -> int:
+    """Returns the DCT perceptual hash of a gray image: the signs of its lowest frequencies compared to their median,
+    as a HASH_BITS bit integer."""
+    small = cv2.resize(gray_array, (HASH_IMAGE_SIZE, HASH_IMAGE_SIZE), interpolation=cv2.INTER_AREA)
+    frequencies = cv2.dct(small.astype(np.float32))[:HASH_SIZE, :HASH_SIZE].flatten()
+    bits = frequencies > np.median(frequencies[1:])
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+
+def _get_hash_similarity(first: int, second: int) -> float:
+    """Returns the share of equal bits between two perceptual hashes."""
+    return 1 - bin(first ^ second).count('1') / HASH_BITS
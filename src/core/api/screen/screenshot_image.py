@@ -3,10 +3,14 @@
 # You can obtain one at http://mozilla.org/MPL/2.0/.
 
 
+import copy
+import itertools
+import logging
+import zlib
+
 import cv2
 import mss
 import numpy as np
-import logging
 
 from pyautogui import screenshot
 
@@ -22,6 +26,7 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 _mss = mss.mss()
+_frame_ids = itertools.count(1)
 
 
 class ScreenshotImage:
@@ -40,6 +45,8 @@ class ScreenshotImage:
             screen_region = {'top': int(region.y), 'left': int(region.x),
                              'width': int(region.width), 'height': int(region.height)}
 
+        self.screen_id = screen_id
+        self.frame_id = next(_frame_ids)
         self._raw_image = _region_to_image(screen_region)
         self._gray_array = _convert_image_to_gray(self._raw_image)
         self._color_array = _convert_image_to_color(self._raw_image)
@@ -65,6 +72,9 @@ class ScreenshotImage:
                                           dsize=(self.width, self.height),
                                           interpolation=cv2.INTER_CUBIC)
 
+        self._fingerprint = None
+        self._color_fingerprint = None
+
 
     def get_gray_array(self):
         """Getter for the gray_array property."""
@@ -89,6 +99,40 @@ class ScreenshotImage:
         """Getter color array property."""
         return self._color_array
 
+    def get_fingerprint(self):
+        """Returns a checksum of the gray pixels, used to tell whether the screen changed between two captures."""
+        if self._fingerprint is None:
+            self._fingerprint = (self.width, self.height, zlib.crc32(np.ascontiguousarray(self._gray_array)))
+        return self._fingerprint
+
+    def get_color_fingerprint(self):
+        """Returns a checksum of the color pixels, for searches that distinguish colors with the same gray level."""
+        if self._color_fingerprint is None:
+            self._color_fingerprint = (self.width, self.height, zlib.crc32(np.ascontiguousarray(self._color_array)))
+        return self._color_fingerprint
+
+    def crop(self, rectangle: Rectangle):
+        """Returns the part of this screenshot covered by a Rectangle, without taking a new screenshot.
+
+        :param rectangle: Rectangle object in coordinates relative to this screenshot, clipped to its bounds.
+        :return: ScreenshotImage object sharing the pixels of this one.
+        """
+        x_0, y_0 = max(0, int(rectangle.x)), max(0, int(rectangle.y))
+        x_1 = max(x_0, min(self.width, int(rectangle.x + rectangle.width)))
+        y_1 = max(y_0, min(self.height, int(rectangle.y + rectangle.height)))
+        raw_scale = self._raw_image.shape[1] / self._gray_array.shape[1]
+
+        sub_image = copy.copy(self)
+        sub_image._raw_image = self._raw_image[int(y_0 * raw_scale):int(y_1 * raw_scale),
+                                               int(x_0 * raw_scale):int(x_1 * raw_scale)]
+        sub_image._gray_array = self._gray_array[y_0:y_1, x_0:x_1]
+        sub_image._color_array = self._color_array[y_0:y_1, x_0:x_1]
+        sub_image.width = x_1 - x_0
+        sub_image.height = y_1 - y_0
+        sub_image._fingerprint = None
+        sub_image._color_fingerprint = None
+        return sub_image
+
     def show_image(self):
         """Displays this image. This method is mainly intended for
         debugging purposes."""
@@ -116,10 +160,12 @@ def _convert_image_to_gray(image):
 
 
 def _convert_image_to_color(image):
-    """Converts an Image to Color
-     :returns np array"""
-
-    return cv2.cvtColor(np.array(image), cv2.COLOR_BGR2RGB)
+    """Converts an Image to Color. pyautogui captures are already RGB, mss captures are BGRA.
+     :returns np array in RGB order"""
+    image = np.array(image)
+    if image.ndim == 3 and image.shape[2] == 3:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGRA2RGB)
 
 
 def _mss_screenshot(region):
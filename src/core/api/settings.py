@@ -31,6 +31,39 @@ class _Settings:
     highlight_color             -   The rectangle/circle border color for the highlight effect.
     highlight_thickness         -   The rectangle/circle border thickness for the highlight effect.
     mouse_scroll_step           -   The number of pixels for a vertical/horizontal scroll event.
+    pyramid_search              -   Search downscaled copies of the screen and pattern first and verify only the best
+                                    candidates at full resolution. Can be overridden per Pattern. (default - False)
+    locality_search             -   Search first around the location where a pattern was last found, and the whole
+                                    region only if it is not there anymore. When a pattern is visible more than once,
+                                    the last location is returned instead of the best score. (default - False)
+    location_priors             -   Remember across runs, in the working directory, where each pattern was found and
+                                    search those locations before the whole region. When a pattern is visible more
+                                    than once, a remembered location is returned instead of the best score.
+                                    (default - False)
+    match_thread_count          -   The number of threads used to correlate large screenshots, split in overlapping
+                                    tiles. Values below 2 keep the search on a single thread. (default - 1)
+    search_all_displays         -   Search every display, each at its own scale, when no region is given, instead of
+                                    only the primary one. (default - False)
+    multi_scale_search          -   Retry a pattern at each of search_scales when it is not found at its own scale, and
+                                    remember the scale that matched for each display. Can be overridden per Pattern.
+                                    (default - False)
+    search_scales               -   Scale factors tried by the multi-scale search, besides 1.
+    statistical_prefilter       -   Skip the correlation of windows that fall on flat screen areas, using integral
+                                    image statistics of the screenshot. (default - False)
+    sub_patch_search            -   Search large patterns by a small distinctive part of them first, and verify the
+                                    candidates with the whole pattern. Can be overridden per Pattern. (default - False)
+    incremental_search          -   While waiting for a pattern to appear or vanish, correlate only the screen areas
+                                    that changed since the previous polling tick. (default - True)
+    result_cache                -   Reuse the result of a search repeated on an unchanged screen, for instance by
+                                    exists(), find() and click() called back to back. (default - True)
+    baseline_similarity         -   Minimum structural similarity of every tile of a capture compared to its
+                                    baseline. (default - 0.95)
+    state_min_confidence        -   Minimum perceptual hash similarity for a registered screen state to be identified
+                                    without template verification. (default - 0.9)
+    search_backend              -   Matching engine used to search Patterns: 'template' (normalized cross-correlation),
+                                    'orb' (keypoints and homography, for scaled or transformed elements) or 'auto'
+                                    (template, then orb when nothing is found). Can be overridden per Pattern.
+                                    (default - 'template')
     """
 
     DEFAULT_MIN_SIMILARITY = 0.8
@@ -56,6 +89,20 @@ class _Settings:
     DEFAULT_UI_DELAY_SHORT = 0.5
     DEFAULT_UI_DELAY_LONG = 2.5
     DEFAULT_SYSTEM_DELAY = 5
+    DEFAULT_PYRAMID_SEARCH = False
+    DEFAULT_LOCALITY_SEARCH = False
+    DEFAULT_LOCATION_PRIORS = False
+    DEFAULT_MATCH_THREAD_COUNT = 1
+    DEFAULT_SEARCH_ALL_DISPLAYS = False
+    DEFAULT_MULTI_SCALE_SEARCH = False
+    DEFAULT_SEARCH_SCALES = (0.5, 0.75, 0.8, 0.9, 1.1, 1.25, 1.5, 2)
+    DEFAULT_STATISTICAL_PREFILTER = False
+    DEFAULT_SUB_PATCH_SEARCH = False
+    DEFAULT_INCREMENTAL_SEARCH = True
+    DEFAULT_RESULT_CACHE = True
+    DEFAULT_BASELINE_SIMILARITY = 0.95
+    DEFAULT_STATE_MIN_CONFIDENCE = 0.9
+    DEFAULT_SEARCH_BACKEND = 'template'
 
     def __init__(self, wait_scan_rate=DEFAULT_WAIT_SCAN_RATE, type_delay=DEFAULT_TYPE_DELAY,
                  move_mouse_delay=DEFAULT_MOVE_MOUSE_DELAY, click_delay=DEFAULT_CLICK_DELAY,
@@ -72,7 +119,21 @@ class _Settings:
                  highlight_thickness=DEFAULT_HIGHLIGHT_THICKNESS,
                  mouse_scroll_step=DEFAULT_MOUSE_SCROLL_STEP,
                  key_shortcut_delay=DEFAULT_KEY_SHORTCUT_DELAY,
-                 site_load_timeout=DEFAULT_SITE_LOAD_TIMEOUT):
+                 site_load_timeout=DEFAULT_SITE_LOAD_TIMEOUT,
+                 pyramid_search=DEFAULT_PYRAMID_SEARCH,
+                 locality_search=DEFAULT_LOCALITY_SEARCH,
+                 location_priors=DEFAULT_LOCATION_PRIORS,
+                 match_thread_count=DEFAULT_MATCH_THREAD_COUNT,
+                 search_all_displays=DEFAULT_SEARCH_ALL_DISPLAYS,
+                 multi_scale_search=DEFAULT_MULTI_SCALE_SEARCH,
+                 search_scales=DEFAULT_SEARCH_SCALES,
+                 statistical_prefilter=DEFAULT_STATISTICAL_PREFILTER,
+                 sub_patch_search=DEFAULT_SUB_PATCH_SEARCH,
+                 incremental_search=DEFAULT_INCREMENTAL_SEARCH,
+                 result_cache=DEFAULT_RESULT_CACHE,
+                 baseline_similarity=DEFAULT_BASELINE_SIMILARITY,
+                 state_min_confidence=DEFAULT_STATE_MIN_CONFIDENCE,
+                 search_backend=DEFAULT_SEARCH_BACKEND):
 
         self.wait_scan_rate = wait_scan_rate
         self._type_delay = type_delay
@@ -93,6 +154,20 @@ class _Settings:
         self.mouse_scroll_step = mouse_scroll_step
         self.key_shortcut_delay = key_shortcut_delay
         self.site_load_timeout = site_load_timeout
+        self.pyramid_search = pyramid_search
+        self.locality_search = locality_search
+        self.location_priors = location_priors
+        self.match_thread_count = match_thread_count
+        self.search_all_displays = search_all_displays
+        self.multi_scale_search = multi_scale_search
+        self.search_scales = search_scales
+        self.statistical_prefilter = statistical_prefilter
+        self.sub_patch_search = sub_patch_search
+        self.incremental_search = incremental_search
+        self.result_cache = result_cache
+        self.baseline_similarity = baseline_similarity
+        self.state_min_confidence = state_min_confidence
+        self.search_backend = search_backend
 
     @property
     def type_delay(self):
@@ -0,0 +1,9 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import sys
+
+# Iris parses its core arguments from sys.argv when src modules are imported, the pytest arguments are not valid ones.
+sys.argv = sys.argv[:1]
@@ -0,0 +1,63 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.api.finder import image_search
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen import baseline
+from src.core.api.screen import screenshot_image
+from src.core.util.path_manager import PathManager
+
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+
+
+@pytest.fixture
+def screen(monkeypatch, tmp_path):
+    """Serves pyautogui-like RGB captures of a red screen, with a blue square once changed is set."""
+    state = {'changed': False}
+
+    def capture(region):
+        array = np.zeros((int(region.height), int(region.width), 3), dtype=np.uint8)
+        array[:, :] = RED
+        if state['changed']:
+            array[:32, :32] = BLUE
+        return array
+
+    monkeypatch.setattr(screenshot_image, '_region_to_image', capture)
+    monkeypatch.setattr(screenshot_image.OSHelper, 'is_linux', staticmethod(lambda: True))
+    monkeypatch.setattr(baseline, '_get_baseline_dir', lambda: str(tmp_path / 'baselines'))
+    monkeypatch.setattr(PathManager, 'get_debug_image_directory', staticmethod(lambda: str(tmp_path / 'debug')))
+    return state
+
+
+def test_diff_image_keeps_colors(screen):
+    region = Rectangle(0, 0, 64, 64)
+    assert baseline.compare_to_baseline('red', region).is_new
+
+    screen['changed'] = True
+    comparison = baseline.compare_to_baseline('red', region)
+    assert not comparison
+    # The baseline is on the left and the capture on the right, cv2.imread returns BGR.
+    diff_image = cv2.imread(comparison.diff_image_path)
+    assert tuple(int(channel) for channel in diff_image[48, 48]) == (0, 0, 255)
+    assert tuple(int(channel) for channel in diff_image[16, 64 + 16]) == (255, 0, 0)
+
+
+def test_capture_uses_the_scale_of_its_display(screen, monkeypatch):
+    displays = [SimpleNamespace(bounds=Rectangle(0, 0, 960, 600), scale=1),
+                SimpleNamespace(bounds=Rectangle(960, 0, 960, 600), scale=2)]
+    monkeypatch.setattr(image_search, 'DisplayCollection', displays)
+    monkeypatch.setattr(screenshot_image, 'DisplayCollection', displays)
+    monkeypatch.setattr(screenshot_image, '_region_to_image', lambda region: np.zeros(
+        (int(region.height) * 2, int(region.width) * 2, 3), dtype=np.uint8))
+
+    assert baseline.compare_to_baseline('retina', Rectangle(1000, 0, 64, 48)).is_new
+    assert baseline._load_baseline('retina').shape[:2] == (48, 64)
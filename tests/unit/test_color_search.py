@@ -0,0 +1,81 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.core.api.finder import color_search, image_search
+from src.core.api.location import Location
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen import screenshot_image
+
+RED = (255, 0, 0)
+
+
+def _get_shape(region, channels: int):
+    """Captured regions are Rectangles on Linux and mss dicts on other platforms."""
+    if isinstance(region, dict):
+        return int(region['height']), int(region['width']), channels
+    return int(region.height), int(region.width), channels
+
+
+def _rgb_capture(region):
+    """pyautogui capture, used on Linux: RGB."""
+    array = np.zeros(_get_shape(region, 3), dtype=np.uint8)
+    array[:, :] = RED
+    return array
+
+
+def _bgra_capture(region):
+    """mss capture, used on Mac and Windows: BGRA."""
+    array = np.zeros(_get_shape(region, 4), dtype=np.uint8)
+    array[:, :] = (RED[2], RED[1], RED[0], 255)
+    return array
+
+
+@pytest.fixture(params=[_rgb_capture, _bgra_capture], ids=['pyautogui', 'mss'])
+def red_screen(request, monkeypatch):
+    monkeypatch.setattr(screenshot_image, '_region_to_image', request.param)
+
+
+def test_color_at_red_pixel(red_screen):
+    assert color_search.color_at(Location(5, 5)) == RED
+
+
+def test_color_find_red_area(red_screen):
+    areas = color_search.color_find(RED, Rectangle(10, 20, 30, 40))
+    assert len(areas) == 1
+    assert (areas[0].x, areas[0].y, areas[0].width, areas[0].height) == (10, 20, 30, 40)
+
+
+def test_color_count_red_area(red_screen):
+    assert color_search.color_count(RED, Rectangle(0, 0, 8, 4)) == 32
+    assert color_search.color_count((0, 0, 255), Rectangle(0, 0, 8, 4)) == 0
+
+
+@pytest.fixture
+def retina_display(monkeypatch):
+    """Fakes a second display of scale 2 right of the primary one, capturing two pixels per point."""
+    displays = [SimpleNamespace(bounds=Rectangle(0, 0, 960, 600), scale=1),
+                SimpleNamespace(bounds=Rectangle(960, 0, 960, 600), scale=2)]
+    monkeypatch.setattr(image_search, 'DisplayCollection', displays)
+    monkeypatch.setattr(screenshot_image, 'DisplayCollection', displays)
+
+    def capture(region):
+        shape = _get_shape(region, 3)
+        array = np.zeros((shape[0] * 2, shape[1] * 2, 3), dtype=np.uint8)
+        array[:, :] = RED
+        return array
+
+    monkeypatch.setattr(screenshot_image, '_region_to_image', capture)
+
+
+def test_color_find_on_scaled_display(retina_display):
+    areas = color_search.color_find(RED, Rectangle(1000, 20, 30, 40))
+    assert len(areas) == 1
+    assert (areas[0].x, areas[0].y, areas[0].width, areas[0].height) == (1000, 20, 30, 40)
+    assert color_search.color_count(RED, Rectangle(1000, 0, 8, 4)) == 32
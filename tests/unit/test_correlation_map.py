@@ -0,0 +1,94 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.api.finder import image_search
+from src.core.api.settings import Settings
+
+
+def _get_screen(seed: int, blur: bool):
+    """Builds a screenshot-like gray image: flat areas, overlapping boxes and sparse noise."""
+    rng = np.random.RandomState(seed)
+    screen = np.full((1000, 1200), rng.randint(0, 256), dtype=np.uint8)
+    for _ in range(40):
+        x, y = rng.randint(0, 1150), rng.randint(0, 970)
+        screen[y:y + rng.randint(5, 200), x:x + rng.randint(5, 300)] = rng.randint(0, 256)
+    noise = rng.rand(*screen.shape) > 0.97
+    screen[noise] = rng.randint(0, 256, size=screen.shape)[noise]
+    return cv2.GaussianBlur(screen, (9, 9), 0) if blur else screen
+
+
+@pytest.fixture(params=[(0, False), (1, True), (2, False), (3, True)])
+def images(request, monkeypatch):
+    monkeypatch.setattr(Settings, 'statistical_prefilter', False)
+    screen = _get_screen(*request.param)
+    return screen, screen[400:460, 500:580].copy()
+
+
+def _get_map(screen, pattern, monkeypatch, thread_count):
+    monkeypatch.setattr(Settings, 'match_thread_count', thread_count)
+    return image_search._get_correlation_map(screen, pattern)
+
+
+def test_single_thread_map_is_a_single_call(images, monkeypatch):
+    screen, pattern = images
+    assert np.array_equal(_get_map(screen, pattern, monkeypatch, 1),
+                          cv2.matchTemplate(screen, pattern, image_search.FIND_METHOD))
+    assert np.array_equal(_get_map(screen, pattern, monkeypatch, None),
+                          cv2.matchTemplate(screen, pattern, image_search.FIND_METHOD))
+
+
+def test_tiled_map_does_not_depend_on_thread_count(images, monkeypatch):
+    screen, pattern = images
+    tiled = _get_map(screen, pattern, monkeypatch, 2)
+    assert np.array_equal(tiled, _get_map(screen, pattern, monkeypatch, 4))
+    assert np.array_equal(tiled, _get_map(screen, pattern, monkeypatch, 3))
+
+
+def test_tiled_map_matches_untiled_map(images, monkeypatch):
+    screen, pattern = images
+    tiled = _get_map(screen, pattern, monkeypatch, 4)
+    untiled = cv2.matchTemplate(screen, pattern, image_search.FIND_METHOD)
+    assert tiled.shape == untiled.shape
+    assert np.abs(tiled - untiled).max() <= image_search.TILE_TOLERANCE
+    matching = np.maximum(tiled, untiled) > 0.5
+    assert np.abs(tiled - untiled)[matching].max() <= image_search.TILE_TOLERANCE / 10
+    assert np.unravel_index(tiled.argmax(), tiled.shape) == np.unravel_index(untiled.argmax(), untiled.shape)
+
+
+def test_small_screenshot_is_a_single_call(monkeypatch):
+    monkeypatch.setattr(Settings, 'statistical_prefilter', False)
+    screen = _get_screen(4, False)[:image_search.TILE_ROWS + 59]
+    pattern = screen[100:160, 500:580].copy()
+    assert np.array_equal(_get_map(screen, pattern, monkeypatch, 4),
+                          cv2.matchTemplate(screen, pattern, image_search.FIND_METHOD))
+
+
+def test_incremental_map_matches_full_map(images, monkeypatch):
+    monkeypatch.setattr(Settings, 'match_thread_count', None)
+    update_correlation_map = image_search._update_correlation_map
+    updates = []
+    monkeypatch.setattr(image_search, '_update_correlation_map',
+                        lambda *args: updates.append(update_correlation_map(*args)) or updates[-1])
+    screen, pattern = images
+    rng = np.random.RandomState(0)
+    correlation_cache = {}
+    image_search._get_incremental_correlation_map(screen, pattern, correlation_cache, 'area')
+    for step in range(4):
+        screen = screen.copy()
+        for _ in range(3):
+            x, y = rng.randint(0, 1150), rng.randint(0, 950)
+            screen[y:y + rng.randint(5, 60), x:x + rng.randint(5, 80)] = rng.randint(0, 256)
+        if step == 2:
+            screen[300:360, 200:280] = pattern
+        updated = image_search._get_incremental_correlation_map(screen, pattern, correlation_cache, 'area').copy()
+        full = cv2.matchTemplate(screen, pattern, image_search.FIND_METHOD)
+        assert np.abs(updated - full).max() <= image_search.TILE_TOLERANCE
+        matching = np.maximum(updated, full) > 0.5
+        assert np.abs(updated - full)[matching].max() <= image_search.TILE_TOLERANCE / 10
+    assert len(updates) == 4 and all(update is not None for update in updates)
@@ -0,0 +1,69 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.api.finder import image_search
+from src.core.api.finder.pattern import Pattern
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen import screenshot_image
+
+# Two colors with the same gray level.
+GRAY = (100, 100, 100)
+GREEN = (105, 150, 0)
+
+
+@pytest.fixture
+def screen(monkeypatch):
+    """Serves pyautogui-like RGB captures of a gray screen, with a green square once changed is set."""
+    state = {'changed': False}
+
+    def capture(region):
+        if isinstance(region, dict):
+            region = Rectangle(region['left'], region['top'], region['width'], region['height'])
+        array = np.zeros((int(region.height), int(region.width), 3), dtype=np.uint8)
+        array[:, :] = GRAY
+        if state['changed']:
+            array[:8, :8] = GREEN
+        return array
+
+    monkeypatch.setattr(screenshot_image, '_region_to_image', capture)
+    return state
+
+
+@pytest.fixture
+def pattern(tmp_path):
+    path = str(tmp_path / 'square.png')
+    square = np.zeros((16, 16, 3), dtype=np.uint8)
+    square[4:12, 4:12] = 255
+    cv2.imwrite(path, square)
+    return Pattern('square.png', from_path=path)
+
+
+def _get_fingerprints(screen, patterns):
+    region = Rectangle(0, 0, 64, 64)
+    screen['changed'] = False
+    before = image_search._get_frames_fingerprint(image_search._get_screenshots(region), patterns)
+    screen['changed'] = True
+    after = image_search._get_frames_fingerprint(image_search._get_screenshots(region), patterns)
+    return before, after
+
+
+def test_gray_search_ignores_color_changes(screen, pattern):
+    before, after = _get_fingerprints(screen, [pattern])
+    assert before == after
+
+
+def test_color_search_sees_color_changes(screen, pattern):
+    before, after = _get_fingerprints(screen, [pattern.exact()])
+    assert before != after
+
+
+def test_any_color_pattern_sees_color_changes(screen, pattern):
+    gray_pattern = Pattern('square.png', from_path=pattern.get_file_path())
+    before, after = _get_fingerprints(screen, ['text', gray_pattern, pattern.exact()])
+    assert before != after
@@ -0,0 +1,76 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.api.finder import image_search
+from src.core.api.settings import Settings
+
+PATTERN_SHAPE = (29, 48)
+
+
+def _get_color(rng, color: bool):
+    return rng.randint(0, 256, size=3) if color else rng.randint(0, 256)
+
+
+def _get_screen(seed: int, color: bool):
+    """Builds a mostly flat screenshot-like image: a background, a few boxes, a textured pattern at (300, 200) and a
+    pattern textured in a single channel at (600, 500)."""
+    rng = np.random.RandomState(seed)
+    channels = (3,) if color else ()
+    screen = np.empty((700, 1000) + channels, dtype=np.uint8)
+    screen[:] = _get_color(rng, color)
+    for _ in range(4):
+        x, y = rng.randint(0, 950), rng.randint(0, 650)
+        screen[y:y + rng.randint(5, 100), x:x + rng.randint(5, 150)] = _get_color(rng, color)
+    textured = rng.randint(0, 256, size=PATTERN_SHAPE + channels).astype(np.uint8)
+    screen[200:229, 300:348] = textured
+    single = np.full(PATTERN_SHAPE + channels, 90, dtype=np.uint8)
+    if color:
+        single[..., 1] = rng.randint(0, 256, size=PATTERN_SHAPE)
+    else:
+        single[5:9, 5:20] = 200
+    screen[500:529, 600:648] = single
+    return screen, {'textured': textured, 'single channel': single,
+                    'flat': np.full(PATTERN_SHAPE + channels, 77, dtype=np.uint8),
+                    'one color': np.full(PATTERN_SHAPE + channels, (10, 200, 30) if color else 10, dtype=np.uint8),
+                    'flat crop': screen[0:29, 0:48].copy()}
+
+
+@pytest.fixture(autouse=True)
+def prefilter(monkeypatch):
+    monkeypatch.setattr(Settings, 'statistical_prefilter', True)
+    monkeypatch.setattr(Settings, 'match_thread_count', None)
+
+
+@pytest.mark.parametrize('color', [False, True], ids=['gray', 'color'])
+@pytest.mark.parametrize('seed', range(4))
+def test_prefiltered_map_matches_cv2(seed, color):
+    screen, patterns = _get_screen(seed, color)
+    for name, pattern in patterns.items():
+        expected = cv2.matchTemplate(screen, pattern, image_search.FIND_METHOD)
+        res = image_search._get_correlation_map(screen, pattern)
+        high = expected >= 0.5
+        assert np.abs(res - expected).max() <= image_search.TILE_TOLERANCE, name
+        assert np.abs(res - expected)[high].max() <= image_search.TILE_TOLERANCE / 10, name
+        assert cv2.minMaxLoc(res)[3] == cv2.minMaxLoc(expected)[3], name
+
+
+@pytest.mark.parametrize('color', [False, True], ids=['gray', 'color'])
+def test_textured_patterns_are_prefiltered(color):
+    screen, patterns = _get_screen(0, color)
+    assert image_search._prefiltered_correlation_map(screen, patterns['textured']) is not None
+    assert image_search._prefiltered_correlation_map(screen, patterns['single channel']) is not None
+
+
+@pytest.mark.parametrize('color', [False, True], ids=['gray', 'color'])
+def test_flat_patterns_are_left_to_cv2(color):
+    screen, patterns = _get_screen(0, color)
+    for name in ('flat', 'one color', 'flat crop'):
+        assert image_search._prefiltered_correlation_map(screen, patterns[name]) is None, name
+        assert np.array_equal(image_search._get_correlation_map(screen, patterns[name]),
+                              cv2.matchTemplate(screen, patterns[name], image_search.FIND_METHOD)), name
@@ -0,0 +1,66 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.api.finder import image_search
+
+
+def _get_screen(seed: int, color: bool):
+    """Builds a screenshot-like image of noisy boxes, with one pattern pasted at each of the given locations."""
+    rng = np.random.RandomState(seed)
+    shape = (800, 1100, 3) if color else (800, 1100)
+    screen = np.full(shape, 128, dtype=np.uint8)
+    for _ in range(60):
+        x, y = rng.randint(0, 1050), rng.randint(0, 760)
+        screen[y:y + rng.randint(5, 120), x:x + rng.randint(5, 160)] = rng.randint(0, 256, size=shape[2:])
+    pattern = rng.randint(0, 256, size=(60, 90) + shape[2:]).astype(np.uint8)
+    return cv2.GaussianBlur(screen, (5, 5), 0), cv2.GaussianBlur(pattern, (3, 3), 0)
+
+
+def _paste(screen, pattern, locations):
+    p_height, p_width = pattern.shape[:2]
+    for x, y in locations:
+        screen[y:y + p_height, x:x + p_width] = pattern
+    return screen
+
+
+def _exhaustive(screen, pattern):
+    return image_search._get_best_location(cv2.matchTemplate(screen, pattern, image_search.FIND_METHOD))
+
+
+@pytest.mark.parametrize('color', [False, True])
+@pytest.mark.parametrize('locations', [
+    [(500, 300)],
+    [(900, 700), (200, 95)],
+    [(900, 700), (200, 95), (500, 300)],
+    [(40, 600), (900, 10), (41, 650)],
+])
+def test_pyramid_equals_exhaustive_search(color, locations):
+    for seed in range(3):
+        screen, pattern = _get_screen(seed, color)
+        screen = _paste(screen, pattern, locations)
+        fast_match = image_search._pyramid_match_template(screen, pattern, 0.8)
+        max_val, max_loc = _exhaustive(screen, pattern)
+        assert fast_match is not None
+        assert fast_match[1] == max_loc
+        assert fast_match[0] == pytest.approx(max_val, abs=image_search.SCORE_TIE_TOLERANCE)
+
+
+def test_duplicates_report_the_first_in_reading_order():
+    screen, pattern = _get_screen(0, False)
+    screen = _paste(screen, pattern, [(900, 700), (500, 300), (200, 95)])
+    assert _exhaustive(screen, pattern)[1] == (200, 95)
+    assert image_search._pyramid_match_template(screen, pattern, 0.8)[1] == (200, 95)
+
+
+def test_too_many_duplicates_fall_back_to_exhaustive_search():
+    screen, pattern = _get_screen(0, False)
+    locations = [(x, y) for x in (20, 400, 800) for y in (20, 400)]
+    screen = _paste(screen, pattern, locations)
+    assert image_search._pyramid_match_template(screen, pattern, 0.8) is None
+    assert _exhaustive(screen, pattern)[1] == (20, 20)
@@ -0,0 +1,54 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.api.finder import image_search
+from src.core.api.finder.pattern import Pattern
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen import screenshot_image
+from src.core.api.settings import Settings
+
+REGION = Rectangle(0, 0, 200, 150)
+
+
+@pytest.fixture
+def pattern(monkeypatch, tmp_path):
+    """Serves captures of a gray screen holding a textured square at (60, 40), and returns a Pattern of it."""
+    rng = np.random.RandomState(0)
+    square = rng.randint(0, 256, size=(24, 24, 3)).astype(np.uint8)
+    desktop = np.full((REGION.height, REGION.width, 3), 128, dtype=np.uint8)
+    desktop[40:64, 60:84] = square
+
+    def capture(region):
+        if isinstance(region, dict):
+            region = Rectangle(region['left'], region['top'], region['width'], region['height'])
+        return desktop[region.y:region.y + region.height, region.x:region.x + region.width].copy()
+
+    monkeypatch.setattr(screenshot_image, '_region_to_image', capture)
+    monkeypatch.setattr(image_search, 'save_debug_image', lambda *args: None)
+    monkeypatch.setattr(Settings, 'result_cache', True)
+    path = str(tmp_path / 'square.png')
+    cv2.imwrite(path, cv2.cvtColor(square, cv2.COLOR_RGB2BGR))
+    return Pattern('square.png', from_path=path)
+
+
+def test_cache_hit_is_stamped_with_the_current_frame(pattern, monkeypatch):
+    first_frames = image_search._get_screenshots(REGION, [pattern])
+    first = image_search._match_template_in_frames(pattern, first_frames)
+    first[0].search_time = 10.0
+
+    second_frames = image_search._get_screenshots(REGION, [pattern])
+    monkeypatch.setattr(image_search, '_get_backend', lambda pattern: pytest.fail('The search was not cached.'))
+    second = image_search._match_template_in_frames(pattern, second_frames)
+
+    assert (second[0].x, second[0].y, second[0].score) == (first[0].x, first[0].y, first[0].score)
+    assert first[0].frame_id == first_frames[0][1].frame_id
+    assert second[0].frame_id == second_frames[0][1].frame_id
+    assert second[0].frame_id != first[0].frame_id
+    assert second[0].search_time < 10.0
+    assert second[0] is not first[0]
@@ -0,0 +1,90 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+
+
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.api.errors import FindError
+from src.core.api.finder import image_search
+from src.core.api.finder.pattern import Pattern
+from src.core.api.rectangle import Rectangle
+from src.core.api.screen import screenshot_image
+
+BUTTON = Rectangle(900, 400, 90, 40)
+
+
+def _get_desktop():
+    """Builds a 1920x600 RGB desktop made of two 960px displays, with a button straddling their boundary."""
+    rng = np.random.RandomState(0)
+    desktop = np.full((600, 1920, 3), 200, dtype=np.uint8)
+    desktop[BUTTON.y:BUTTON.y + BUTTON.height, BUTTON.x:BUTTON.x + BUTTON.width] = rng.randint(
+        0, 256, size=(BUTTON.height, BUTTON.width, 3))
+    return desktop
+
+
+@pytest.fixture
+def two_displays(monkeypatch, tmp_path):
+    """Fakes two side by side displays. The capture of a part is scaled like the display its centre lies on."""
+    desktop = _get_desktop()
+    monkeypatch.setattr(image_search, 'save_debug_image', lambda *args: None)
+
+    def set_scales(left_scale: float, right_scale: float):
+        displays = [SimpleNamespace(bounds=Rectangle(0, 0, 960, 600), scale=left_scale),
+                    SimpleNamespace(bounds=Rectangle(960, 0, 960, 600), scale=right_scale)]
+        monkeypatch.setattr(image_search, 'DisplayCollection', displays)
+        monkeypatch.setattr(screenshot_image, 'DisplayCollection', displays)
+
+        def capture(region):
+            if isinstance(region, dict):
+                region = Rectangle(region['left'], region['top'], region['width'], region['height'])
+            area = desktop[region.y:region.y + region.height, region.x:region.x + region.width]
+            scale = left_scale if region.x + region.width / 2 < 960 else right_scale
+            return cv2.resize(area, None, fx=scale, fy=scale) if scale != 1 else area.copy()
+
+        monkeypatch.setattr(screenshot_image, '_region_to_image', capture)
+
+    path = str(tmp_path / 'button.png')
+    cv2.imwrite(path, cv2.cvtColor(desktop[BUTTON.y:BUTTON.y + BUTTON.height, BUTTON.x:BUTTON.x + BUTTON.width],
+                                   cv2.COLOR_RGB2BGR))
+    return set_scales, Pattern('button.png', from_path=path)
+
+
+def _find(pattern, region):
+    matches = image_search.match_template(pattern, region)
+    if len(matches) == 0:
+        raise FindError('Unable to find %s' % pattern.get_filename())
+    return matches[0]
+
+
+def test_same_scale_displays_are_captured_whole(two_displays):
+    set_scales, pattern = two_displays
+    set_scales(1, 1)
+    region = Rectangle(800, 300, 400, 200)
+    assert image_search._get_search_regions(region, pattern.get_size()) == [(region, 0)]
+    match = _find(pattern, region)
+    assert (match.x, match.y) == (BUTTON.x, BUTTON.y)
+
+
+def test_different_scale_displays_overlap_by_the_pattern_size(two_displays):
+    set_scales, pattern = two_displays
+    set_scales(1, 2)
+    region = Rectangle(800, 300, 400, 200)
+    parts = image_search._get_search_regions(region, pattern.get_size())
+    assert [(part.x, part.y, part.width, part.height, index) for part, index in parts] == [
+        (800, 300, 160 + BUTTON.width, 200, 0), (960 - BUTTON.width, 300, 240 + BUTTON.width, 200, 1)]
+    match = _find(pattern, region)
+    assert (match.x, match.y) == (BUTTON.x, BUTTON.y)
+
+
+def test_overlapping_parts_report_each_match_once(two_displays):
+    set_scales, pattern = two_displays
+    set_scales(1, 1)
+    frames = image_search._get_screenshots(Rectangle(800, 300, 160 + BUTTON.width, 200), [pattern])
+    frames += image_search._get_screenshots(Rectangle(960 - BUTTON.width, 300, 240, 200), [pattern])
+    matches = image_search._match_template_in_frames(pattern, frames, image_search.MatchTemplateType.MULTIPLE)
+    assert [(match.x, match.y) for match in matches] == [(BUTTON.x, BUTTON.y)]